@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Student, Instructor, LessonPlan, PlanFeature, Appointment, 
-    Review, JobApplication, GiftCard, Referral
+    Review, JobApplication, GiftCard, Referral, DailyMetrics, OutboundMessage
 )
 
 # Register your models here.
@@ -54,11 +54,17 @@ class PlanFeatureAdmin(admin.ModelAdmin):
 
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
-    list_display = ('student', 'instructor', 'plan', 'scheduled_time', 'status', 'credits_used')
-    list_filter = ('status', 'scheduled_time', 'plan')
+    list_display = ('student', 'instructor', 'plan', 'scheduled_time', 'status', 'test_passed', 'credits_used')
+    list_filter = ('status', 'test_passed', 'scheduled_time', 'plan')
     search_fields = ('student__user__username', 'instructor__user__username')
     date_hierarchy = 'scheduled_time'
-    list_editable = ('status',)
+    list_editable = ('status', 'test_passed')
+
+@admin.register(DailyMetrics)
+class DailyMetricsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'bookings', 'completed', 'cancellations', 'no_shows', 'credits_sold', 'credits_consumed', 'revenue')
+    date_hierarchy = 'date'
+    readonly_fields = ('updated_at',)
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -71,8 +77,8 @@ class ReviewAdmin(admin.ModelAdmin):
 class JobApplicationAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'email', 'phone', 'applied_at')
     list_filter = ('applied_at',)
-    search_fields = ('first_name', 'last_name', 'email', 'phone')
-    readonly_fields = ('applied_at',)
+    search_fields = ('first_name', 'last_name', 'email', 'phone', 'cv_text')
+    readonly_fields = ('applied_at', 'cv_sha256', 'cv_text', 'cv_processed_at')
 
 @admin.register(GiftCard)
 class GiftCardAdmin(admin.ModelAdmin):
@@ -89,3 +95,10 @@ class ReferralAdmin(admin.ModelAdmin):
     search_fields = ('referrer__username', 'referred_email')
     readonly_fields = ('created_at',)
     list_editable = ('is_converted',)
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ('channel', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('channel', 'status', 'created_at')
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
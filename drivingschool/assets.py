@@ -0,0 +1,256 @@
+# driving_school/assets.py
+"""
+Static asset build and serving.
+
+``AssetStorage`` is the production staticfiles storage. When
+``collectstatic`` runs, it minifies every stylesheet and drops rules whose
+classes or ids appear nowhere in ``templates/`` or in our JavaScript. It also
+recompresses JPEG and PNG images. It then stores each file under a content
+hashed name, like ``ManifestStaticFilesStorage``, and writes ``.gz`` siblings
+for text assets, plus ``.br`` siblings when the ``brotli`` package is
+installed.
+
+``serve`` hands those files out with the best encoding the client accepts.
+Hashed names get an immutable, year-long ``Cache-Control``.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+import re
+from io import BytesIO
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404
+from django.template.utils import get_app_template_dirs
+from django.utils._os import safe_join
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map')
+JPEG_QUALITY = 82
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=3600'
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+COMMENT = re.compile(r'/\*(?!!).*?\*/', re.S)
+STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+SELECTOR_NAME = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+WORD = re.compile(r'[\w-]+')
+# Class names assembled in templates, e.g. alert-{{ message.tags }}
+DYNAMIC_PREFIX = re.compile(r'([\w-]+-)\{[{%]')
+
+
+# CSS
+
+def minify_css(css):
+    """Strip comments and redundant whitespace, leaving quoted strings alone."""
+    css = COMMENT.sub('', css)
+    parts = STRING.split(css)
+    for i in range(0, len(parts), 2):
+        code = re.sub(r'\s+', ' ', parts[i])
+        code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+        code = re.sub(r':\s+', ':', code)
+        parts[i] = code.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def split_blocks(css):
+    """Top-level ``(prelude, body)`` pairs of minified CSS; statements get a body of None."""
+    blocks, depth, start, prelude, quote = [], 0, 0, '', None
+    for i, char in enumerate(css):
+        if quote:
+            if char == quote and css[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                prelude, start = css[start:i], i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:i]))
+                start = i + 1
+        elif char == ';' and depth == 0:
+            blocks.append((css[start:i], None))
+            start = i + 1
+    return blocks
+
+
+def split_selectors(prelude):
+    selectors, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        depth += {'(': 1, '[': 1, ')': -1, ']': -1}.get(char, 0)
+        if char == ',' and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    return selectors + [prelude[start:]]
+
+
+def selector_used(selector, used, prefixes):
+    # Names inside :not(...) or [attr=...] do not need to exist for a match
+    selector = re.sub(r'\([^()]*\)|\[[^\]]*\]', '', selector)
+    return all(name in used or name.startswith(prefixes) for name in SELECTOR_NAME.findall(selector))
+
+
+def prune_css(css, used, prefixes=()):
+    """
+    Drop style rules whose selectors name a class or id that is neither in
+    ``used`` nor starts with one of ``prefixes``.
+    """
+    prefixes = tuple(prefixes)
+    out = []
+    for prelude, body in split_blocks(css):
+        if body is None:
+            out.append(prelude + ';')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = prune_css(body, used, prefixes)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            out.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [s for s in split_selectors(prelude) if selector_used(s, used, prefixes)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(out)
+
+
+def used_names():
+    """
+    ``(words, prefixes)`` from the templates, our JavaScript and this app's
+    Python (form widgets set classes). Every class or id in use is one of the
+    words or starts with one of the prefixes.
+    """
+    dirs = [d for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+    dirs += list(get_app_template_dirs('templates'))
+    files = [os.path.join(root, name) for d in dirs for root, _, names in os.walk(d) for name in names]
+    app_dir = os.path.dirname(__file__)
+    files += [os.path.join(app_dir, name) for name in os.listdir(app_dir) if name.endswith('.py')]
+    for finder in finders.get_finders():
+        files += [storage.path(path) for path, storage in finder.list([]) if path.endswith('.js')]
+
+    words, prefixes = set(), set()
+    for path in files:
+        with open(path, encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        words.update(WORD.findall(text))
+        prefixes.update(DYNAMIC_PREFIX.findall(text))
+    return words, prefixes
+
+
+# Images
+
+def recompress_image(data, extension):
+    """Smaller encoding of a JPEG or PNG, or None when it would not shrink."""
+    with Image.open(BytesIO(data)) as image:
+        buffer = BytesIO()
+        if extension in ('.jpg', '.jpeg'):
+            image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True,
+                       icc_profile=image.info.get('icc_profile'))
+        else:
+            image.save(buffer, 'PNG', optimize=True)
+    output = buffer.getvalue()
+    return output if len(output) < len(data) else None
+
+
+# Storage
+
+class AssetStorage(ManifestStaticFilesStorage):
+    """Manifest storage that minifies, prunes and recompresses before hashing, then pre-compresses."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = self.optimize(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.precompress()
+
+    def optimize(self, paths):
+        project_dirs = {os.path.abspath(d) for d in settings.STATICFILES_DIRS}
+        used = None
+        optimized = dict(paths)
+        for path, (storage, source_path) in paths.items():
+            extension = os.path.splitext(path)[1].lower()
+            if extension not in ('.css', '.jpg', '.jpeg', '.png'):
+                continue
+            # Always start from the source so rebuilds never recompress twice
+            with storage.open(source_path) as f:
+                data = f.read()
+            if extension == '.css':
+                css = minify_css(data.decode('utf-8'))
+                if os.path.abspath(storage.location) in project_dirs:
+                    used = used or used_names()
+                    css = prune_css(css, *used)
+                output = css.encode('utf-8')
+            else:
+                try:
+                    output = recompress_image(data, extension)
+                except (OSError, ValueError):
+                    output = None
+                if output is None:
+                    continue
+            self.delete(path)
+            self._save(path, ContentFile(output))
+            optimized[path] = (self, path)
+        return optimized
+
+    def precompress(self):
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in names:
+            if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            encoders = [('.gz', lambda d: gzip.compress(d, 9, mtime=0))]
+            if brotli is not None:
+                encoders.append(('.br', brotli.compress))
+            for suffix, encode in encoders:
+                compressed = encode(data)
+                if len(compressed) < len(data):
+                    self.delete(name + suffix)
+                    self._save(name + suffix, ContentFile(compressed))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # A few templates reference assets that were never added; keep their
+            # plain URL instead of failing the whole page
+            return name
+
+
+# Serving
+
+def serve(request, path):
+    """Serve a collected static file, preferring a pre-compressed sibling the client accepts."""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, posixpath.normpath(path).lstrip('/'))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    accepted = request.headers.get('Accept-Encoding', '')
+    chosen, encoding = fullpath, None
+    for suffix, name in (('.br', 'br'), ('.gz', 'gzip')):
+        if name in accepted and os.path.isfile(fullpath + suffix):
+            chosen, encoding = fullpath + suffix, name
+            break
+
+    response = FileResponse(open(chosen, 'rb'), content_type=content_type)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE if HASHED_NAME.search(path) else REVALIDATE
+    return response
@@ -0,0 +1,168 @@
+# driving_school/availability.py
+"""
+Per-instructor, per-day availability index.
+
+Each (instructor, day) pair is stored in the cache as a ``DaySchedule`` of the
+busy intervals of its scheduled appointments. Saving or deleting an
+appointment anywhere (views, the admin, the shell) forgets the entries for
+its old and new day (see ``signals.py``); bulk updates call ``forget``
+themselves. The booking calendar can then answer
+slot lookups from the cache without querying the database.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+from . import stats
+from .models import Appointment
+from .scheduling import DaySchedule, LESSON_MINUTES
+
+# Bookable hourly slots (9 AM to 5 PM); lessons must end by closing time
+SLOT_TIMES = [time(hour, 0) for hour in range(9, 18)]
+SLOT_LABELS = [slot.strftime('%H:%M') for slot in SLOT_TIMES]
+SLOT_MINUTES = 60
+CLOSING_MINUTE = 18 * 60
+
+INDEX_TIMEOUT = 60 * 60 * 24
+
+
+def cache_key(instructor_id, day):
+    return f"availability:{instructor_id}:{day.isoformat()}"
+
+
+def local_day(dt):
+    """Return the local calendar date of an aware datetime."""
+    return timezone.localtime(dt).date()
+
+
+def day_bounds(start_day, end_day):
+    """Aware [start, end) datetimes covering ``start_day`` through ``end_day``."""
+    start = timezone.make_aware(datetime.combine(start_day, time.min))
+    end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min))
+    return start, end
+
+
+def build_range(instructor_ids, start_day, end_day):
+    """
+    ``DaySchedule``s for several instructors over a date range from a single
+    range query, keyed by ``(instructor_id, day)``. Nothing is cached.
+    """
+    start, end = day_bounds(start_day, end_day)
+    appointments = Appointment.objects.filter(
+        instructor_id__in=instructor_ids,
+        scheduled_time__gte=start,
+        scheduled_time__lt=end,
+        status='Scheduled',
+    ).only('instructor_id', 'scheduled_time', 'duration_minutes')
+
+    grouped = defaultdict(list)
+    for appointment in appointments:
+        grouped[(appointment.instructor_id, local_day(appointment.scheduled_time))].append(appointment)
+
+    schedules = {}
+    day = start_day
+    while day <= end_day:
+        for instructor_id in instructor_ids:
+            schedules[(instructor_id, day)] = DaySchedule.from_appointments(grouped.get((instructor_id, day), []))
+        day += timedelta(days=1)
+    return schedules
+
+
+def load_range(instructor_ids, start_day, end_day):
+    """
+    The index for several instructors over a date range, as a dict mapping
+    ``(instructor_id, day)`` to its ``DaySchedule``. Cached entries are read
+    with one ``get_many``; only the missing ones are built (with one range
+    query) and written back.
+    """
+    pairs = [
+        (instructor_id, start_day + timedelta(days=offset))
+        for offset in range((end_day - start_day).days + 1)
+        for instructor_id in instructor_ids
+    ]
+    cached = cache.get_many([cache_key(*pair) for pair in pairs])
+    schedules = {pair: cached[cache_key(*pair)] for pair in pairs if cache_key(*pair) in cached}
+
+    missing = [pair for pair in pairs if pair not in schedules]
+    if missing:
+        built = build_range(
+            sorted({instructor_id for instructor_id, _ in missing}),
+            min(day for _, day in missing),
+            max(day for _, day in missing),
+        )
+        fresh = {pair: built[pair] for pair in missing}
+        cache.set_many({cache_key(*pair): schedule for pair, schedule in fresh.items()}, INDEX_TIMEOUT)
+        schedules.update(fresh)
+    return schedules
+
+
+def refresh(instructor_id, day):
+    """Rebuild the index entry for one instructor/day after a data change."""
+    schedule = build_range([instructor_id], day, day)[(instructor_id, day)]
+    cache.set(cache_key(instructor_id, day), schedule, INDEX_TIMEOUT)
+    return schedule
+
+
+def forget(pairs):
+    """Drop cached entries for ``(instructor_id, day)`` pairs; they rebuild on next use."""
+    cache.delete_many([cache_key(instructor_id, day) for instructor_id, day in pairs])
+
+
+def appointment_slot(appointment):
+    """
+    The ``(instructor_id, day)`` index entry an appointment occupies, or None
+    when either field is unset or was deferred by the query that loaded it.
+    """
+    instructor_id = appointment.__dict__.get('instructor_id')
+    scheduled_time = appointment.__dict__.get('scheduled_time')
+    if instructor_id is None or scheduled_time is None:
+        return None
+    return instructor_id, local_day(scheduled_time)
+
+
+def close_appointments(appointments, status):
+    """
+    Move the still-scheduled rows of ``appointments`` to ``status``
+    ('Completed' or 'No-show') with a single UPDATE, then forget the index
+    entries of the days they were on. Returns the number of rows changed.
+    """
+    rows = list(appointments.filter(status='Scheduled').values_list('id', 'instructor_id', 'scheduled_time'))
+    if not rows:
+        return 0
+    # Re-check the status so rows cancelled meanwhile are left alone
+    updated = Appointment.objects.filter(id__in=[row[0] for row in rows], status='Scheduled').update(status=status)
+    if status == 'Completed':
+        stats.adjust('completed_lessons', updated)
+    forget({(instructor_id, local_day(scheduled_time)) for _, instructor_id, scheduled_time in rows})
+    return updated
+
+
+def busy_schedule(instructor_id, day):
+    """Return the cached ``DaySchedule``, building it on first use."""
+    schedule = cache.get(cache_key(instructor_id, day))
+    if schedule is None:
+        schedule = refresh(instructor_id, day)
+    return schedule
+
+
+def booked_slots(schedule):
+    """Hourly slot labels that are at least partly taken."""
+    return [
+        label for slot, label in zip(SLOT_TIMES, SLOT_LABELS)
+        if schedule.overlaps(slot.hour * 60 + slot.minute, slot.hour * 60 + slot.minute + SLOT_MINUTES)
+    ]
+
+
+def available_slots(schedule, day, now=None, duration=LESSON_MINUTES):
+    """List the slot start times where a lesson of ``duration`` minutes fits."""
+    now = timezone.localtime(now or timezone.now())
+    slots = []
+    for slot, label in zip(SLOT_TIMES, SLOT_LABELS):
+        start_minute = slot.hour * 60 + slot.minute
+        end_minute = start_minute + duration
+        if end_minute > CLOSING_MINUTE or schedule.overlaps(start_minute, end_minute):
+            continue
+        if day == now.date() and slot <= now.time():
+            continue
+        slots.append(label)
+    return slots
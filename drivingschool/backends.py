@@ -0,0 +1,61 @@
+# driving_school/backends.py
+"""
+Log in with a username or an email address.
+
+The login form accepts either. ``UsernameOrEmailBackend`` finds the account
+in one query that hits an index for each side: the unique index on
+``username``, and the unique ``lower(email)`` index added in migration 0022.
+It then checks the password once. Email matching ignores case; usernames
+keep Django's exact matching.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import F, Lookup, Q
+from django.db.models.functions import Lower
+
+UserModel = get_user_model()
+
+
+class NotEqual(Lookup):
+    lookup_name = 'ne'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} <> {rhs}', (*lhs_params, *rhs_params)
+
+
+def email_lookup(email):
+    """
+    Filter matching ``email`` case-insensitively. It repeats the partial
+    index's ``email <> ''`` condition so the database can use
+    ``auth_user_email_lower_uniq``.
+    """
+    return Q(email_lower=email.strip().lower()) & Q(NotEqual(F('email'), ''))
+
+
+def users_with_email(email):
+    return UserModel.objects.alias(email_lower=Lower('email')).filter(email_lookup(email))
+
+
+class UsernameOrEmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        lookup = Q(username=username)
+        if '@' in username:
+            lookup |= email_lookup(username)
+        candidates = list(UserModel.objects.alias(email_lower=Lower('email')).filter(lookup)[:2])
+        # Someone's username may equal another account's email; the username wins
+        user = next((c for c in candidates if c.username == username), candidates[0] if candidates else None)
+
+        if user is None:
+            # Hash anyway so unknown accounts take as long as wrong passwords
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,49 @@
+# driving_school/cartbadge.py
+"""
+Cached cart item counts for the header badge.
+
+Each user's cart id and each cart's item count are kept in the cache, so the
+badge in ``base.html`` costs no queries once warm. ``CartItem`` saves and
+deletes drop the count for their cart and creating or deleting a ``Cart``
+drops the user's entry (see ``signals.py``); both are rebuilt on next use.
+"""
+from django.core.cache import cache
+from .models import Cart, CartItem
+
+BADGE_TIMEOUT = 60 * 60 * 24
+
+
+def user_key(user_id):
+    return f"cartbadge:user:{user_id}"
+
+
+def count_key(cart_id):
+    return f"cartbadge:cart:{cart_id}"
+
+
+def cart_id_for(user_id):
+    """The user's cart id, or 0 if they have none."""
+    cart_id = cache.get(user_key(user_id))
+    if cart_id is None:
+        cart_id = Cart.objects.filter(student__user_id=user_id).values_list('id', flat=True).first() or 0
+        cache.set(user_key(user_id), cart_id, BADGE_TIMEOUT)
+    return cart_id
+
+
+def item_count(user_id):
+    cart_id = cart_id_for(user_id)
+    if not cart_id:
+        return 0
+    count = cache.get(count_key(cart_id))
+    if count is None:
+        count = CartItem.objects.filter(cart_id=cart_id).count()
+        cache.set(count_key(cart_id), count, BADGE_TIMEOUT)
+    return count
+
+
+def forget_cart(cart_id):
+    cache.delete(count_key(cart_id))
+
+
+def forget_user(user_id):
+    cache.delete(user_key(user_id))
@@ -0,0 +1,40 @@
+# driving_school/catalog.py
+"""
+Cached lesson plan catalog.
+
+Active plans are loaded once with their features prefetched and kept in the
+cache under a version key, which is kept in the ``counters`` cache so culling
+never drops it. Saving or deleting a ``LessonPlan`` or
+``PlanFeature`` bumps the version (see ``signals.py``), so every page picks up
+the new catalog on its next request.
+"""
+import time
+from django.core.cache import cache, caches
+from .models import LessonPlan
+
+VERSION_KEY = 'catalog:version'
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+
+def version():
+    """Current catalog version, used to key cached plans and page fragments."""
+    return caches['counters'].get_or_set(VERSION_KEY, time.time_ns, None)
+
+
+def invalidate():
+    # A fresh timestamp can never collide with a version cached earlier
+    caches['counters'].set(VERSION_KEY, time.time_ns(), None)
+
+
+def active_plans():
+    """Active plans in display order, each with ``features`` prefetched."""
+    key = f"catalog:plans:{version()}"
+    plans = cache.get(key)
+    if plans is None:
+        plans = list(LessonPlan.objects.filter(is_active=True).prefetch_related('features'))
+        cache.set(key, plans, CATALOG_TIMEOUT)
+    return plans
+
+
+def plans_by_type(package_type):
+    return [plan for plan in active_plans() if plan.package_type == package_type]
@@ -0,0 +1,26 @@
+# driving_school/context_processors.py
+from . import cartbadge, catalog, pagecache, stats
+
+
+def cart_badge(request):
+    """Cart item count for the header badge, from the per-user cache."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'cart_items_count': cartbadge.item_count(user.id)}
+
+
+def content_versions(request):
+    """
+    Versions that key the {% cache %} fragments. They are passed uncalled, so
+    the cache is only consulted by templates that use them.
+    """
+    return {'catalog_version': catalog.version, 'content_version': pagecache.version}
+
+
+def site_stats(request):
+    """
+    Cached landing-page counters for the shared about section. Passed uncalled
+    so only pages that show them read the cache; they never count tables.
+    """
+    return {'site_stats': stats.cached_stats}
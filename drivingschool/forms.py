@@ -1,6 +1,7 @@
 # driving_school/forms.py
 from django import forms
 from django.contrib.auth.models import User
+from .backends import users_with_email
 from .models import *
 
 class RegistrationForm(forms.Form):
@@ -24,7 +25,7 @@ class RegistrationForm(forms.Form):
 
     def clean_email(self):
         email = self.cleaned_data['email']
-        if User.objects.filter(email=email).exists():
+        if users_with_email(email).exists():
             raise forms.ValidationError('Email already registered. Please use a different email or login.')
         return email
 
@@ -81,6 +82,18 @@ class AppointmentForm(forms.ModelForm):
         }
 
 class JobApplicationForm(forms.ModelForm):
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Files rejected by CVUploadHandler never reach FILES; report why instead of "required"
+        self.upload_errors = upload_errors or {}
+        if 'cv' in self.upload_errors:
+            self.fields['cv'].required = False
+
+    def clean_cv(self):
+        if 'cv' in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors['cv'])
+        return self.cleaned_data['cv']
+
     class Meta:
         model = JobApplication
         fields = ['first_name', 'last_name', 'email', 'phone', 'cv']
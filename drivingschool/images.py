@@ -0,0 +1,128 @@
+# driving_school/images.py
+"""
+Responsive image derivatives.
+
+``variants`` resizes an uploaded image (an ``ImageField`` file such as
+``Instructor.photo`` or ``Review.image``) or a static image to each width in
+``WIDTHS`` that is no wider than the original. Every size is saved as WebP
+and as a JPEG fallback under ``derivatives/`` in media storage. File names
+start with the source's content hash, so a replaced image never reuses stale
+files and identical sources share them. Derivatives are built on first use
+(or ahead of time by ``build_image_derivatives``) and the resulting URLs are
+cached, so later renders do not touch the disk.
+"""
+import hashlib
+from collections import defaultdict
+from io import BytesIO
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+WIDTHS = (160, 320, 640, 1280)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+FORMATS = (('WEBP', 'webp'), ('JPEG', 'jpg'))
+MANIFEST_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def read_source(image):
+    """Bytes of an image field file or of a static file given by its path."""
+    if isinstance(image, str):
+        path = finders.find(image)
+        if path is None:
+            raise FileNotFoundError(image)
+        with open(path, 'rb') as f:
+            return f.read()
+    with image.storage.open(image.name, 'rb') as f:
+        return f.read()
+
+
+def manifest_key(image):
+    name = f"static:{image}" if isinstance(image, str) else f"media:{image.name}"
+    return f"images:{hashlib.md5(name.encode()).hexdigest()}"
+
+
+def target_widths(width):
+    widths = [w for w in WIDTHS if w < width]
+    # Always offer the original width (or the largest size we make)
+    return widths + [min(width, WIDTHS[-1])]
+
+
+def encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'WEBP':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+    else:
+        if image.mode != 'RGB':
+            # JPEG has no alpha; flatten transparent areas onto white
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = background
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def derivative_name(digest, width, extension):
+    return f"derivatives/{digest[:2]}/{digest}-{width}.{extension}"
+
+
+def oriented_size(image):
+    """Size after EXIF rotation, read from the header without decoding pixels."""
+    width, height = image.size
+    # Orientations 5-8 turn the image on its side
+    if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def build(data):
+    """Write any missing derivatives for image bytes ``data`` and return the manifest."""
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    with Image.open(BytesIO(data)) as source:
+        width, height = oriented_size(source)
+        targets = target_widths(width)
+        missing = defaultdict(list)
+        for target in targets:
+            for fmt, extension in FORMATS:
+                name = derivative_name(digest, target, extension)
+                if not default_storage.exists(name):
+                    missing[target].append((fmt, name))
+
+        # Only decode and resize the source when some size is not on disk yet
+        if missing:
+            original = ImageOps.exif_transpose(source)
+            if original.mode not in ('RGB', 'RGBA'):
+                original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+            for target, outputs in missing.items():
+                resized = original.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+                for fmt, name in outputs:
+                    default_storage.save(name, ContentFile(encode(resized, fmt)))
+
+    manifest = {'width': width, 'height': height}
+    for fmt, extension in FORMATS:
+        manifest[fmt.lower()] = [(target, default_storage.url(derivative_name(digest, target, extension))) for target in targets]
+    return manifest
+
+
+def variants(image):
+    """
+    Cached manifest ``{'width', 'height', 'webp': [(w, url)], 'jpeg': [(w, url)]}``
+    for ``image``, building derivatives on first use. Returns None when the
+    source is missing or not an image.
+    """
+    key = manifest_key(image)
+    manifest = cache.get(key)
+    if manifest is None:
+        try:
+            manifest = build(read_source(image))
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+        cache.set(key, manifest, MANIFEST_TIMEOUT)
+    return manifest
+
+
+def forget(image):
+    """Drop the cached manifest after an image field changes."""
+    cache.delete(manifest_key(image))
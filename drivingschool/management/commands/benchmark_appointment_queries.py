@@ -0,0 +1,111 @@
+import random
+import time
+from datetime import timedelta
+from statistics import median
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from drivingschool import availability, scheduling
+from drivingschool.models import Appointment, Instructor, Student
+
+INDEX_NAMES = ['appt_instructor_time_idx', 'appt_instr_status_time_idx', 'appt_student_status_idx']
+
+
+class Command(BaseCommand):
+    help = 'Seed a large Appointment table and report query plans and timings for the hot paths (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000, help='Number of appointments to seed')
+        parser.add_argument('--instructors', type=int, default=25)
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            instructor, student, day = self.seed(options)
+            self.stdout.write(self.style.SUCCESS(f"Seeded {Appointment.objects.count()} appointments"))
+
+            self.stdout.write(self.style.MIGRATE_HEADING('With composite indexes'))
+            self.run_queries(instructor, student, day, options['repeat'], 'indexed')
+
+            with connection.cursor() as cursor:
+                for name in INDEX_NAMES:
+                    cursor.execute(connection.SchemaEditorClass.sql_delete_index % {
+                        'name': connection.ops.quote_name(name),
+                        'table': connection.ops.quote_name(Appointment._meta.db_table),
+                    })
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Without composite indexes'))
+            self.run_queries(instructor, student, day, options['repeat'], 'unindexed')
+
+            # Never keep the seeded rows or the dropped indexes
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Benchmark finished; all changes rolled back.'))
+
+    def seed(self, options):
+        instructors = []
+        for i in range(options['instructors']):
+            user = User.objects.create(username=f"bench_instructor_{i}")
+            instructors.append(Instructor(user=user, phone='0', bio='Benchmark'))
+        instructors = Instructor.objects.bulk_create(instructors)
+
+        users = User.objects.bulk_create([User(username=f"bench_student_{i}") for i in range(options['students'])])
+        students = Student.objects.bulk_create([Student(user=user) for user in users])
+
+        # Lessons every two hours per instructor, spread around today
+        start = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=365 * 3)
+        statuses = ['Completed'] * 6 + ['Cancelled', 'No-show', 'Scheduled', 'Scheduled']
+        batch = []
+        for i in range(options['rows']):
+            slot = i // len(instructors)
+            batch.append(Appointment(
+                student=students[i % len(students)],
+                instructor=instructors[i % len(instructors)],
+                scheduled_time=start + timedelta(hours=2 * slot),
+                status=random.choice(statuses),
+                duration_minutes=scheduling.LESSON_MINUTES,
+            ))
+            if len(batch) == 10000:
+                Appointment.objects.bulk_create(batch)
+                batch = []
+        Appointment.objects.bulk_create(batch)
+
+        sample = Appointment.objects.order_by('-scheduled_time').first()
+        return instructors[0], students[0], availability.local_day(sample.scheduled_time) - timedelta(days=30)
+
+    def explain(self, queryset, phase):
+        # The phase comment keeps SQLite from reusing a plan cached before the indexes were dropped
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql} /* {phase} */", params)
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+    def run_queries(self, instructor, student, day, repeat, phase):
+        day_start, day_end = availability.day_bounds(day, day)
+        lesson_start = day_start + timedelta(hours=11)
+        queries = {
+            'availability (range)': Appointment.objects.filter(
+                instructor=instructor, status='Scheduled',
+                scheduled_time__gte=day_start, scheduled_time__lt=day_end,
+            ),
+            'availability (__date)': Appointment.objects.filter(
+                instructor=instructor, status='Scheduled', scheduled_time__date=day,
+            ),
+            'conflict check': Appointment.objects.filter(
+                instructor=instructor, status='Scheduled',
+                scheduled_time__gt=lesson_start - timedelta(minutes=scheduling.MAX_LESSON_MINUTES),
+                scheduled_time__lt=lesson_start + timedelta(minutes=scheduling.LESSON_MINUTES),
+            ),
+            'instructor schedule': Appointment.objects.filter(instructor=instructor).order_by('scheduled_time')[:50],
+            'student completed lessons': Appointment.objects.filter(student=student, status='Completed'),
+        }
+        for label, queryset in queries.items():
+            self.stdout.write(self.style.HTTP_INFO(label))
+            self.stdout.write(self.explain(queryset, phase))
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f"  median {median(timings):.3f} ms over {repeat} runs\n")
@@ -0,0 +1,73 @@
+import time
+from statistics import median
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from drivingschool import catalog, stats
+from drivingschool.models import Instructor, Review
+
+DUMMY_FRAGMENTS = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'template-benchmark'},
+    'counters': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'template-benchmark-counters'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def contexts():
+    """The context each view passes to its template."""
+    return {
+        'base.html': {},
+        'index.html': {'plans': catalog.active_plans(), 'stats': stats.site_stats(), 'pass_rate': '98%'},
+        'pricing.html': {
+            'standard_plans': catalog.plans_by_type('standard'),
+            'specialized_plans': catalog.plans_by_type('specialized'),
+        },
+        'about.html': {'instructors': Instructor.objects.all(), 'reviews': Review.objects.order_by('-created_at')[:3]},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Time rendering base, index, pricing and about templates: re-parsing every time, with the cached '
+        'loader, and with the cached loader plus {% cache %} fragments'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help='Timed renders per template and mode')
+
+    def handle(self, *args, **options):
+        users = {'anonymous': AnonymousUser()}
+        member = User.objects.filter(is_active=True, is_staff=False).first()
+        if member:
+            users['signed in'] = member
+
+        loader = engines['django'].engine.template_loaders[0]
+        header = f"{'template':<14}{'user':<11}{'re-parsed':>12}{'cached loader':>15}{'+ fragments':>13}"
+        self.stdout.write(header)
+        for label, user in users.items():
+            request = RequestFactory().get('/')
+            request.user = user
+            for name in contexts():
+                with override_settings(CACHES=DUMMY_FRAGMENTS):
+                    reparsed = self.time(name, request, options['repeat'], before=loader.reset)
+                    cached = self.time(name, request, options['repeat'])
+                fragments = self.time(name, request, options['repeat'])
+                self.stdout.write(
+                    f"{name:<14}{label:<11}{reparsed:>10.2f}ms{cached:>13.2f}ms{fragments:>11.2f}ms"
+                )
+        self.stdout.write(self.style.SUCCESS('Median render times shown; fragment timings are warm cache hits.'))
+
+    def time(self, name, request, repeat, before=None):
+        # One untimed render warms the loader, the catalog and the fragments
+        render_to_string(name, contexts()[name], request)
+        timings = []
+        for _ in range(repeat):
+            context = contexts()[name]
+            if before:
+                before()
+            start = time.perf_counter()
+            render_to_string(name, context, request)
+            timings.append((time.perf_counter() - start) * 1000)
+        return median(timings)
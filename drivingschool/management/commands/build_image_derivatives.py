@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from drivingschool import images
+from drivingschool.models import Instructor, Review
+
+# Static images rendered through {% responsive_image %}
+STATIC_IMAGES = ['images/celebrationai.png', 'images/userrating1.jpeg']
+
+
+class Command(BaseCommand):
+    help = 'Build WebP and JPEG derivatives for instructor photos, review images and static images ahead of the first request'
+
+    def handle(self, *args, **options):
+        sources = list(STATIC_IMAGES)
+        sources += [i.photo for i in Instructor.objects.exclude(photo='').exclude(photo__isnull=True)]
+        sources += [r.image for r in Review.objects.exclude(image='').exclude(image__isnull=True)]
+
+        built = 0
+        for source in sources:
+            images.forget(source)
+            if images.variants(source) is None:
+                self.stderr.write(f'Could not build derivatives for {source}')
+            else:
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f'Built derivatives for {built} images.'))
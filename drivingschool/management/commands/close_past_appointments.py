@@ -0,0 +1,39 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from drivingschool import availability
+from drivingschool.models import Appointment
+
+STATUSES = {'completed': 'Completed', 'no-show': 'No-show'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Close Scheduled appointments that started more than --grace-hours ago, marking them Completed '
+        '(or No-show) in batches. Run nightly, before rollup_daily_metrics.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mark', choices=sorted(STATUSES), default='completed', help='Status to give stale appointments')
+        parser.add_argument('--grace-hours', type=int, default=12, help='Leave lessons that started within this many hours for the instructor to close')
+        parser.add_argument('--batch-size', type=int, default=500, help='Appointments updated per UPDATE statement')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        status = STATUSES[options['mark']]
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        stale = Appointment.objects.filter(status='Scheduled', scheduled_time__lt=cutoff)
+
+        total = 0
+        while True:
+            # Each batch is short and commits on its own, so bookings are never blocked for long
+            with transaction.atomic():
+                batch = stale.order_by('scheduled_time', 'id')[:options['batch_size']].values_list('id', flat=True)
+                closed = availability.close_appointments(Appointment.objects.filter(id__in=list(batch)), status)
+            if not closed:
+                break
+            total += closed
+
+        self.stdout.write(self.style.SUCCESS(f'Marked {total} past appointments as {status}.'))
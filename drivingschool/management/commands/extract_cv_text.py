@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from drivingschool import uploads
+from drivingschool.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = 'Extract searchable text from job application CVs that have not been processed yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Applications processed per batch')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        pending = JobApplication.objects.filter(cv_processed_at__isnull=True).order_by('id')
+        processed = 0
+        # Identical CVs share a hash; extract each file once per run
+        texts = {}
+        while True:
+            batch = list(pending[:options['batch_size']])
+            if not batch:
+                break
+            for application in batch:
+                key = application.cv_sha256 or application.cv.name
+                if key not in texts:
+                    texts[key] = self.extract(application)
+                application.cv_text = texts[key]
+                application.cv_processed_at = timezone.now()
+            JobApplication.objects.bulk_update(batch, ['cv_text', 'cv_processed_at'])
+            processed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Extracted text from {processed} CVs.'))
+
+    def extract(self, application):
+        try:
+            return uploads.extract_text(application.cv.path)
+        except Exception as e:
+            # A broken or missing file should not stall the queue
+            self.stderr.write(f'Could not read CV for application {application.id}: {e}')
+            return ''
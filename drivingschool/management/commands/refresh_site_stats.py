@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from drivingschool import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the cached landing page counters (students, completed lessons, instructor rating, pass rate). Run hourly.'
+
+    def handle(self, *args, **options):
+        values = stats.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f"{name.replace('_', ' ')}: {value}" for name, value in values.items())
+        ))
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from drivingschool import reports
+from drivingschool.models import Appointment, DailyMetrics
+
+# Days aggregated per pair of grouped queries
+CHUNK_DAYS = 90
+# Lessons are closed up to a day late (see close_past_appointments), so
+# recent days are recomputed on every run
+REFRESH_DAYS = 7
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll up appointments and purchases into DailyMetrics: days not rolled up yet, plus the last '
+        '--refresh-days days again, since their lesson statuses may have changed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Recompute from this date (YYYY-MM-DD) instead of the day after the latest rollup')
+        parser.add_argument('--refresh-days', type=int, default=REFRESH_DAYS, help='Recent days recomputed on every run')
+
+    def handle(self, *args, **options):
+        # Today is still changing; it is rolled up on the next run
+        end_day = timezone.localdate() - timedelta(days=1)
+
+        if options['since']:
+            try:
+                start_day = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+        else:
+            if options['refresh_days'] < 0:
+                raise CommandError('--refresh-days cannot be negative')
+            latest = DailyMetrics.objects.aggregate(latest=Max('date'))['latest']
+            if latest:
+                start_day = min(latest + timedelta(days=1), end_day - timedelta(days=options['refresh_days'] - 1))
+            else:
+                start_day = self.first_activity_day()
+
+        if start_day is None or start_day > end_day:
+            self.stdout.write(self.style.SUCCESS('Daily metrics are up to date.'))
+            return
+
+        day = start_day
+        while day <= end_day:
+            chunk_end = min(day + timedelta(days=CHUNK_DAYS - 1), end_day)
+            reports.store_daily_metrics(reports.compute_daily_metrics(day, chunk_end))
+            day = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up daily metrics for {(end_day - start_day).days + 1} days ({start_day} to {end_day}).'
+        ))
+
+    def first_activity_day(self):
+        first_appointment = Appointment.objects.aggregate(first=Min('scheduled_time'))['first']
+        first_purchase = reports.completed_purchases().aggregate(first=Min('purchase_date'))['first']
+        firsts = [timezone.localtime(dt).date() for dt in (first_appointment, first_purchase) if dt]
+        return min(firsts) if firsts else None
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from drivingschool import reminders
+
+
+class Command(BaseCommand):
+    help = (
+        'Queue 24h and 2h lesson reminders for upcoming appointments in batches. Run every few minutes; '
+        'send_outbound_messages delivers them. Safe to run from several workers at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Appointments claimed per transaction')
+        parser.add_argument('--kind', choices=list(reminders.KINDS), help='Only queue this reminder kind')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        kinds = [options['kind']] if options['kind'] else list(reminders.KINDS)
+        for kind in kinds:
+            total = 0
+            while True:
+                handled = reminders.send_due(kind, options['batch_size'])
+                if not handled:
+                    break
+                total += handled
+            self.stdout.write(self.style.SUCCESS(f'Queued {kind} reminders for {total} appointments.'))
@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from drivingschool import outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound messages in batches, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages locked and sent per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new messages instead of exiting when the queue is drained')
+        parser.add_argument('--interval', type=float, default=10, help='Seconds to sleep between polls with --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        while True:
+            totals = [0, 0, 0]
+            while True:
+                counts = outbox.deliver_due(options['batch_size'])
+                if not any(counts):
+                    break
+                totals = [total + count for total, count in zip(totals, counts)]
+
+            if any(totals) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Sent {totals[0]} messages, {totals[1]} will be retried, {totals[2]} failed permanently.'
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
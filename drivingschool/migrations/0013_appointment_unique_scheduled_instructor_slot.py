@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0012_appointment_duration_minutes_and_more'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'Scheduled')), fields=('instructor', 'scheduled_time'), name='unique_scheduled_instructor_slot'),
+        ),
+    ]
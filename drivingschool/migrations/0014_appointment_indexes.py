@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0013_appointment_unique_scheduled_instructor_slot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['instructor', 'scheduled_time'], name='appt_instructor_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['instructor', 'status', 'scheduled_time'], name='appt_instr_status_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['student', 'status'], name='appt_student_status_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0014_appointment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('bookings', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+                ('no_shows', models.IntegerField(default=0)),
+                ('credits_sold', models.IntegerField(default=0)),
+                ('credits_consumed', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'daily metrics',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
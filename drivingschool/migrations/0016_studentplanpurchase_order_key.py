@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0015_dailymetrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentplanpurchase',
+            name='order_key',
+            field=models.CharField(blank=True, help_text='Checkout submission that created this purchase', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='studentplanpurchase',
+            constraint=models.UniqueConstraint(condition=models.Q(('order_key', ''), _negated=True), fields=('order_key', 'plan'), name='unique_order_plan'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0017_outboundmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='digest_key',
+            field=models.CharField(blank=True, help_text='Messages with the same recipient and key are sent as one digest', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='outboundmessage',
+            name='channel',
+            field=models.CharField(choices=[('email', 'Email'), ('sms', 'SMS')], default='email', max_length=10),
+        ),
+    ]
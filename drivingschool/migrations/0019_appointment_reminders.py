@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0018_outboundmessage_sms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='reminder_24h_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='reminder_2h_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('reminder_24h_sent_at__isnull', True), ('status', 'Scheduled')), fields=['scheduled_time'], name='appt_due_24h_reminder_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('reminder_2h_sent_at__isnull', True), ('status', 'Scheduled')), fields=['scheduled_time'], name='appt_due_2h_reminder_idx'),
+        ),
+    ]
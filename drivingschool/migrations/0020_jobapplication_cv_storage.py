@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:06
+
+import drivingschool.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0019_appointment_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='cv_processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='cv_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='cv_text',
+            field=models.TextField(blank=True, help_text='Extracted by the extract_cv_text command'),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='cv',
+            field=models.FileField(max_length=255, storage=drivingschool.uploads.cv_storage, upload_to=drivingschool.uploads.cv_upload_to),
+        ),
+    ]
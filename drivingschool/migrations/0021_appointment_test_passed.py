@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivingschool', '0020_jobapplication_cv_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='test_passed',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('drivingschool', '0021_appointment_test_passed'),
+    ]
+
+    operations = [
+        # Backs email login and the registration duplicate check; accounts
+        # without an email are left out so they never collide
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX auth_user_email_lower_uniq ON auth_user (LOWER(email)) WHERE email <> ''",
+            reverse_sql='DROP INDEX auth_user_email_lower_uniq',
+        ),
+    ]
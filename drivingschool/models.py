@@ -1,7 +1,10 @@
 # driving_school/models.py
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from .uploads import cv_storage, cv_upload_to, file_sha256
 
 class Student(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -81,19 +84,42 @@ class PlanFeature(models.Model):
     def __str__(self):
         return f"{self.plan.name} - {self.feature_text}"
 
+class CartQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate item_count, total_price and total_credits in the same query."""
+        return self.annotate(
+            item_count=models.Count('cartitem'),
+            total_price=Coalesce(
+                models.Sum('cartitem__plan__price'), models.Value(0),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            ),
+            total_credits=Coalesce(models.Sum('cartitem__plan__hours'), models.Value(0)),
+        )
+
 class Cart(models.Model):
     student = models.OneToOneField(Student, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CartQuerySet.as_manager()
+    
     def __str__(self):
         return f"Cart for {self.student.user.get_full_name()}"
     
+    def get_totals(self):
+        """Item count, price and credits, from ``with_totals`` or one aggregate query."""
+        if not hasattr(self, 'total_price'):
+            totals = Cart.objects.filter(pk=self.pk).with_totals().values('item_count', 'total_price', 'total_credits').get()
+            self.item_count = totals['item_count']
+            self.total_price = totals['total_price']
+            self.total_credits = totals['total_credits']
+        return self.item_count, self.total_price, self.total_credits
+    
     def get_total_price(self):
-        return sum(item.plan.price for item in self.cartitem_set.all())
+        return self.get_totals()[1]
     
     def get_total_credits(self):
-        return sum(item.plan.hours for item in self.cartitem_set.all())
+        return self.get_totals()[2]
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE)
@@ -119,10 +145,24 @@ class StudentPlanPurchase(models.Model):
     credits_granted = models.IntegerField()
     purchase_date = models.DateTimeField(auto_now_add=True)
     payment_id = models.CharField(max_length=100, blank=True)  # For future payment integration
+    order_key = models.CharField(max_length=64, blank=True, help_text="Checkout submission that created this purchase")
+    
+    class Meta:
+        constraints = [
+            # A resubmitted checkout cannot buy the same plan twice
+            models.UniqueConstraint(
+                fields=['order_key', 'plan'],
+                condition=~models.Q(order_key=''),
+                name='unique_order_plan',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student} - {self.plan.name} ({self.payment_status})"
 
+# Longest lesson we sell; scheduling.overlapping_appointments relies on it
+MAX_LESSON_MINUTES = 8 * 60
+
 class Appointment(models.Model):
     STATUS_CHOICES = [
         ('Scheduled', 'Scheduled'),
@@ -147,11 +187,67 @@ class Appointment(models.Model):
     special_requirements = models.TextField(blank=True)
     credits_used = models.IntegerField(default=1)
     notes = models.TextField(blank=True)
-    duration_minutes = models.IntegerField(default=60)
+    duration_minutes = models.IntegerField(default=60, validators=[MinValueValidator(1), MaxValueValidator(MAX_LESSON_MINUTES)])
+    reminder_24h_sent_at = models.DateTimeField(null=True, blank=True)
+    reminder_2h_sent_at = models.DateTimeField(null=True, blank=True)
+    # Outcome of the driving test this lesson led to, when there was one
+    test_passed = models.BooleanField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Instructor schedule and conflict range scans
+            models.Index(fields=['instructor', 'scheduled_time'], name='appt_instructor_time_idx'),
+            # Availability lookups: one instructor, one status, a day's time range
+            models.Index(fields=['instructor', 'status', 'scheduled_time'], name='appt_instr_status_time_idx'),
+            # Student history and progress counts
+            models.Index(fields=['student', 'status'], name='appt_student_status_idx'),
+            # Reminder scans: only scheduled lessons still owed that reminder are indexed
+            models.Index(
+                fields=['scheduled_time'],
+                condition=models.Q(status='Scheduled', reminder_24h_sent_at__isnull=True),
+                name='appt_due_24h_reminder_idx',
+            ),
+            models.Index(
+                fields=['scheduled_time'],
+                condition=models.Q(status='Scheduled', reminder_2h_sent_at__isnull=True),
+                name='appt_due_2h_reminder_idx',
+            ),
+        ]
+        constraints = [
+            # An instructor can only hold one scheduled lesson per start time
+            models.UniqueConstraint(
+                fields=['instructor', 'scheduled_time'],
+                condition=models.Q(status='Scheduled'),
+                name='unique_scheduled_instructor_slot',
+            ),
+            # Conflict checks only look back MAX_LESSON_MINUTES for overlapping lessons
+            models.CheckConstraint(
+                condition=models.Q(duration_minutes__gte=1, duration_minutes__lte=MAX_LESSON_MINUTES),
+                name='appointment_duration_range',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.scheduled_time}"
 
+class DailyMetrics(models.Model):
+    date = models.DateField(unique=True)
+    bookings = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    cancellations = models.IntegerField(default=0)
+    no_shows = models.IntegerField(default=0)
+    credits_sold = models.IntegerField(default=0)
+    credits_consumed = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'daily metrics'
+
+    def __str__(self):
+        return f"Metrics for {self.date}"
+
 class Review(models.Model):
     student = models.CharField(max_length=100)
     instructor = models.CharField(max_length=100)
@@ -168,9 +264,18 @@ class JobApplication(models.Model):
     last_name = models.CharField(max_length=50)
     email = models.EmailField()
     phone = models.CharField(max_length=15, blank=True)
-    cv = models.FileField(upload_to='careers/')
+    cv = models.FileField(upload_to=cv_upload_to, storage=cv_storage, max_length=255)
+    cv_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    cv_text = models.TextField(blank=True, help_text="Extracted by the extract_cv_text command")
+    cv_processed_at = models.DateTimeField(null=True, blank=True)
     applied_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        # New uploads are stored under their content hash
+        if self.cv and not self.cv._committed:
+            self.cv_sha256 = file_sha256(self.cv.file)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -191,4 +296,41 @@ class Referral(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.referrer} referred {self.referred_email}"
\ No newline at end of file
+        return f"{self.referrer} referred {self.referred_email}"
+
+class OutboundMessage(models.Model):
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, default='email')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    reply_to = models.EmailField(blank=True)
+    digest_key = models.CharField(max_length=50, blank=True, help_text="Messages with the same recipient and key are sent as one digest")
+    attempts = models.PositiveIntegerField(default=0)
+    # While sending, when the worker's claim lapses and another may retry it
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, help_text="Worker run that claimed this message for sending")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # The worker's due scan: pending rows in next_attempt_at order
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} ({self.status})"
@@ -0,0 +1,141 @@
+# driving_school/outbox.py
+"""
+Database-backed queue for outgoing messages.
+
+Views call ``enqueue_email`` and return straight away; the row commits with
+the rest of the request. The ``send_outbound_messages`` command delivers due
+rows in batches, reusing one connection per batch (SMS rows are handed to
+``sms.send_batch``). Each batch is claimed by moving its rows from pending to
+sending with a conditional UPDATE before anything is sent, so concurrent
+workers never send the same row, even on SQLite. A failed message is retried
+with exponential backoff and given up on after ``MAX_ATTEMPTS``.
+"""
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from . import sms
+from .models import OutboundMessage
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 60 * 60 * 6
+# A worker that dies mid-batch leaves rows in 'sending'; they are due again after this
+CLAIM_SECONDS = 60 * 10
+
+
+def enqueue_email(recipients, subject, body, reply_to=''):
+    """Queue one email per recipient; ``recipients`` is an address or a list."""
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    return OutboundMessage.objects.bulk_create([
+        OutboundMessage(channel='email', recipient=recipient, subject=subject, body=body, reply_to=reply_to or '')
+        for recipient in recipients
+    ])
+
+
+def retry_delay(attempts):
+    """Backoff after the ``attempts``-th failure: 1, 2, 4, ... minutes, capped."""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def send_email_batch(messages):
+    """Send emails over one connection; return ``{message id: error}`` for failures."""
+    errors = {}
+    try:
+        with get_connection() as email_connection:
+            for message in messages:
+                email = EmailMessage(
+                    subject=message.subject,
+                    body=message.body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[message.recipient],
+                    reply_to=[message.reply_to] if message.reply_to else None,
+                    connection=email_connection,
+                )
+                try:
+                    email.send()
+                except Exception as e:
+                    errors[message.id] = str(e) or e.__class__.__name__
+    except Exception as e:
+        # Could not open the connection at all; every message failed
+        for message in messages:
+            errors.setdefault(message.id, str(e) or e.__class__.__name__)
+    return errors
+
+
+CHANNEL_SENDERS = {
+    'email': send_email_batch,
+    'sms': sms.send_batch,
+}
+
+
+def due_messages(now):
+    # Claimed rows count as due again once their claim has lapsed
+    return OutboundMessage.objects.filter(
+        status__in=['pending', 'sending'], next_attempt_at__lte=now,
+    ).order_by('next_attempt_at', 'id')
+
+
+def lock_batch(queryset, batch_size):
+    """
+    Rows for this worker. Where the database supports it, rows another worker
+    has locked are skipped instead of waited on. SQLite cannot lock rows, so
+    callers that must not share rows also need a conditional write (see
+    ``claim_batch``).
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset[:batch_size])
+
+
+def claim_batch(batch_size, now):
+    """
+    Claim up to ``batch_size`` due messages and return them. The UPDATE only
+    takes rows that are still due, so when two workers pick the same rows
+    each row goes to exactly one of them.
+    """
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        ids = lock_batch(due_messages(now).values_list('id', flat=True), batch_size)
+        due_messages(now).filter(id__in=ids).update(
+            status='sending', claim_token=token, next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS),
+        )
+    return list(OutboundMessage.objects.filter(status='sending', claim_token=token).order_by('id'))
+
+
+def deliver_due(batch_size=100, now=None):
+    """
+    Deliver one batch of due messages. Returns ``(sent, retried, failed)``;
+    a batch with nothing due returns all zeros.
+    """
+    now = now or timezone.now()
+    # Sent outside any transaction: the claim has already committed
+    batch = claim_batch(batch_size, now)
+    errors = {}
+    for channel, sender in CHANNEL_SENDERS.items():
+        messages = [message for message in batch if message.channel == channel]
+        if messages:
+            errors.update(sender(messages))
+
+    sent, retried, failed = [], [], []
+    for message in batch:
+        message.attempts += 1
+        if message.id not in errors:
+            message.status = 'sent'
+            message.sent_at = now
+            message.last_error = ''
+            sent.append(message)
+        elif message.attempts >= MAX_ATTEMPTS:
+            message.status = 'failed'
+            message.last_error = errors[message.id]
+            failed.append(message)
+        else:
+            message.status = 'pending'
+            message.next_attempt_at = now + retry_delay(message.attempts)
+            message.last_error = errors[message.id]
+            retried.append(message)
+    OutboundMessage.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    return len(sent), len(retried), len(failed)
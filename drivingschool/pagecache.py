@@ -0,0 +1,72 @@
+# driving_school/pagecache.py
+"""
+Whole-page cache for the anonymous marketing pages.
+
+Anonymous visitors all see the same HTML, so the rendered response is cached
+per path under a content version. Requests with a query string are rendered
+fresh and never stored. Saving or deleting the models those pages
+show bumps the version (see ``signals.py``). Responses carry ETag and
+Last-Modified headers so repeat visitors are answered with 304s.
+"""
+import hashlib
+import time
+from functools import wraps
+from django.contrib.messages import get_messages
+from django.core.cache import cache, caches
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, set_response_etag,
+)
+from django.utils.http import http_date, parse_http_date
+
+VERSION_KEY = 'pages:version'
+PAGE_TIMEOUT = 60 * 15
+
+
+def version():
+    return caches['counters'].get_or_set(VERSION_KEY, time.time_ns, None)
+
+
+def purge():
+    # A fresh timestamp orphans every page cached under the old version
+    caches['counters'].set(VERSION_KEY, time.time_ns(), None)
+
+
+def cache_key(request):
+    path = hashlib.md5(request.path.encode()).hexdigest()
+    return f"pages:{version()}:{path}"
+
+
+def anonymous_page_cache(view):
+    """Serve a view from the page cache for anonymous GET/HEAD requests."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # Logged-in users, query strings (contact reads ?package=, and arbitrary
+        # ones would evict real pages) and pending flash messages always get a
+        # fresh render
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.GET
+            or request.user.is_authenticated
+            or get_messages(request)
+        ):
+            return view(request, *args, **kwargs)
+
+        key = cache_key(request)
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            set_response_etag(response)
+            response['Last-Modified'] = http_date()
+            cache.set(key, response, PAGE_TIMEOUT)
+
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ['Cookie'])
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date(response['Last-Modified']),
+            response=response,
+        )
+    return wrapper
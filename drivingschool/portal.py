@@ -0,0 +1,127 @@
+# driving_school/portal.py
+"""
+Context loaders for the student and instructor portals.
+
+The student row comes back with its user and appointment counters in one
+annotated query (the cart count comes from the ``cart_badge`` context
+processor); appointments are paginated and pre-joined with their
+instructor, and purchases are fetched once for both panels that list them.
+
+The instructor schedule is read one window at a time (today, this week, a
+custom range or past lessons) and paged with a ``(scheduled_time, id)``
+cursor, so each page is a single indexed range query however many lessons
+the instructor has taught.
+
+Both pages cost the same handful of queries however long the history is.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from . import catalog
+from .models import Appointment, Instructor, Student, StudentPlanPurchase
+
+APPOINTMENTS_PER_PAGE = 10
+SCHEDULE_PAGE_SIZE = 25
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def load_student(student_id):
+    return (
+        Student.objects
+        .select_related('user')
+        .annotate(
+            appointment_count=Count('appointment'),
+            completed_count=Count('appointment', filter=Q(appointment__status='Completed')),
+        )
+        .get(pk=student_id)
+    )
+
+
+def appointments_page(student, page_number):
+    appointments = (
+        Appointment.objects
+        .filter(student=student)
+        .select_related('instructor__user')
+        .order_by('-scheduled_time', '-id')
+    )
+    paginator = Paginator(appointments, APPOINTMENTS_PER_PAGE)
+    # The total is already on the student row; skip the paginator's COUNT(*)
+    paginator.count = student.appointment_count
+    return paginator.get_page(page_number)
+
+
+def student_portal_context(student_id, page_number=1):
+    student = load_student(student_id)
+    page = appointments_page(student, page_number)
+    purchases = list(
+        StudentPlanPurchase.objects
+        .filter(student=student, payment_status='completed')
+        .select_related('plan')
+        .order_by('-purchase_date')
+    )
+    total = student.total_credits
+    progress = (student.completed_count / total) * 100 if total > 0 else 0
+
+    return {
+        'student': student,
+        'appointments': page,
+        'completed': student.completed_count,
+        'total': total,
+        'progress': progress,
+        'plans': catalog.active_plans(),
+        'plan_purchases': purchases,
+        'available_credits': student.available_credits,
+        'purchased_plans': purchases,
+        'instructors': Instructor.objects.filter(is_available=True).select_related('user'),
+    }
+
+
+def encode_cursor(appointment):
+    """URL-safe ``<microseconds since epoch>.<id>`` cursor for an appointment."""
+    micros = (appointment.scheduled_time - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{appointment.id}"
+
+
+def decode_cursor(cursor):
+    """Return ``(scheduled_time, id)`` for a cursor, or None if it is malformed."""
+    try:
+        micros, appointment_id = cursor.split('.')
+        return EPOCH + timedelta(microseconds=int(micros)), int(appointment_id)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def instructor_schedule(instructor_id, start=None, end=None, after=None, descending=False, limit=SCHEDULE_PAGE_SIZE):
+    """
+    One page of an instructor's appointments in ``[start, end)`` with student
+    and plan joined in. Rows are ordered by ``(scheduled_time, id)``, newest
+    first when ``descending``, and continue after the ``after`` cursor.
+
+    Returns ``(appointments, next_cursor)``; ``next_cursor`` is None on the
+    last page.
+    """
+    appointments = Appointment.objects.filter(instructor_id=instructor_id).select_related('student__user', 'plan')
+    if start is not None:
+        appointments = appointments.filter(scheduled_time__gte=start)
+    if end is not None:
+        appointments = appointments.filter(scheduled_time__lt=end)
+
+    position = decode_cursor(after) if after else None
+    if position is not None:
+        scheduled_time, appointment_id = position
+        if descending:
+            appointments = appointments.filter(
+                Q(scheduled_time__lt=scheduled_time) | Q(scheduled_time=scheduled_time, id__lt=appointment_id)
+            )
+        else:
+            appointments = appointments.filter(
+                Q(scheduled_time__gt=scheduled_time) | Q(scheduled_time=scheduled_time, id__gt=appointment_id)
+            )
+
+    ordering = ['-scheduled_time', '-id'] if descending else ['scheduled_time', 'id']
+    # One extra row tells us whether another page follows
+    rows = list(appointments.order_by(*ordering)[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
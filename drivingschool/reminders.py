@@ -0,0 +1,54 @@
+# driving_school/reminders.py
+"""
+Lesson reminders 24 hours and 2 hours ahead.
+
+Each kind has its own ``reminder_*_sent_at`` marker on ``Appointment`` and a
+partial index over the scheduled lessons still owed that reminder, so finding
+due lessons is one range scan over a small index. A lesson closer than the
+next, shorter lead only gets the shorter reminder.
+
+Batches are claimed with ``select_for_update(skip_locked=True)`` where the
+database supports it, and the reminders are queued in the same transaction
+that sets the marker, so parallel workers never remind a student twice.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from . import outbox, sms
+from .models import Appointment
+
+# Lead time and marker field per kind, longest lead first
+KINDS = {
+    '24h': (timedelta(hours=24), 'reminder_24h_sent_at'),
+    '2h': (timedelta(hours=2), 'reminder_2h_sent_at'),
+}
+
+
+def window(kind, now):
+    """The ``(start, end]`` range of start times owed a ``kind`` reminder at ``now``."""
+    lead, _ = KINDS[kind]
+    shorter = [other for other, _ in KINDS.values() if other < lead]
+    return now + max(shorter, default=timedelta(0)), now + lead
+
+
+def due(kind, now):
+    start, end = window(kind, now)
+    return Appointment.objects.filter(
+        status='Scheduled',
+        scheduled_time__gt=start,
+        scheduled_time__lte=end,
+        **{f'{KINDS[kind][1]}__isnull': True},
+    ).order_by('scheduled_time', 'id')
+
+
+def send_due(kind, batch_size=100, now=None):
+    """Queue one batch of ``kind`` reminders; returns how many lessons were handled."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = outbox.lock_batch(due(kind, now).values_list('id', flat=True), batch_size)
+        if not ids:
+            return 0
+        appointments = Appointment.objects.filter(id__in=ids).select_related('student', 'instructor__user')
+        sms.queue_lesson_reminders(appointments)
+        Appointment.objects.filter(id__in=ids).update(**{KINDS[kind][1]: now})
+    return len(ids)
@@ -0,0 +1,165 @@
+# driving_school/reports.py
+"""
+Figures for the admin dashboard.
+
+``compute_daily_metrics`` aggregates appointments and completed plan purchases
+into one ``DailyMetrics`` row per day; the ``rollup_daily_metrics`` command
+stores them. The dashboard reads trends and revenue breakdowns from that
+rollup, so its cost depends on the number of days shown, not on history size.
+Today is not rolled up yet; revenue breakdowns add it from a live query over
+just today's purchases.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from .models import Appointment, DailyMetrics, StudentPlanPurchase
+
+PERIOD_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+METRIC_FIELDS = [
+    'bookings', 'completed', 'cancellations', 'no_shows',
+    'credits_sold', 'credits_consumed', 'revenue',
+]
+
+
+def start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def completed_purchases():
+    return StudentPlanPurchase.objects.filter(payment_status='completed')
+
+
+def total_revenue():
+    return completed_purchases().aggregate(total=Sum('plan__price'))['total'] or Decimal('0')
+
+
+def compute_daily_metrics(start_day, end_day):
+    """
+    Build unsaved ``DailyMetrics`` rows for ``start_day`` through ``end_day``
+    with one grouped query on appointments and one on purchases.
+    """
+    start, end = start_of(start_day), start_of(end_day + timedelta(days=1))
+    metrics = {}
+
+    def row(day):
+        if day not in metrics:
+            metrics[day] = DailyMetrics(date=day)
+        return metrics[day]
+
+    appointment_totals = (
+        Appointment.objects
+        .filter(scheduled_time__gte=start, scheduled_time__lt=end)
+        .annotate(day=TruncDate('scheduled_time'))
+        .values('day')
+        .annotate(
+            bookings=Count('id'),
+            completed=Count('id', filter=Q(status='Completed')),
+            cancellations=Count('id', filter=Q(status='Cancelled')),
+            no_shows=Count('id', filter=Q(status='No-show')),
+            credits_consumed=Sum('credits_used', filter=Q(status='Completed')),
+        )
+    )
+    for totals in appointment_totals:
+        metrics_row = row(totals['day'])
+        metrics_row.bookings = totals['bookings']
+        metrics_row.completed = totals['completed']
+        metrics_row.cancellations = totals['cancellations']
+        metrics_row.no_shows = totals['no_shows']
+        metrics_row.credits_consumed = totals['credits_consumed'] or 0
+
+    purchase_totals = (
+        completed_purchases()
+        .filter(purchase_date__gte=start, purchase_date__lt=end)
+        .annotate(day=TruncDate('purchase_date'))
+        .values('day')
+        .annotate(credits_sold=Sum('credits_granted'), revenue=Sum('plan__price'))
+    )
+    for totals in purchase_totals:
+        metrics_row = row(totals['day'])
+        metrics_row.credits_sold = totals['credits_sold'] or 0
+        metrics_row.revenue = totals['revenue'] or Decimal('0')
+
+    # Days without activity still get a row so the rollup has no gaps
+    day = start_day
+    while day <= end_day:
+        row(day)
+        day += timedelta(days=1)
+    return [metrics[day] for day in sorted(metrics)]
+
+
+def store_daily_metrics(rows):
+    """Insert or overwrite rollup rows by date."""
+    return DailyMetrics.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=METRIC_FIELDS + ['updated_at'],
+    )
+
+
+def daily_trends(days, today=None):
+    """Rollup rows for the ``days`` days before ``today``, oldest first."""
+    today = today or timezone.localdate()
+    return list(DailyMetrics.objects.filter(date__gte=today - timedelta(days=days), date__lt=today).order_by('date'))
+
+
+def revenue_by_period(period, since):
+    """
+    Revenue and plan credits sold grouped by ``period`` ('day', 'week' or
+    'month') from the rollup, for days on or after ``since``, oldest first.
+    """
+    trunc = PERIOD_FUNCTIONS[period]
+    return list(
+        DailyMetrics.objects
+        .filter(date__gte=since)
+        .annotate(period=trunc('date'))
+        .values('period')
+        .annotate(revenue=Sum('revenue'), credits_sold=Sum('credits_sold'))
+        .order_by('period')
+    )
+
+
+def live_revenue(day):
+    """Revenue and credits sold on ``day`` straight from purchases, for days not rolled up yet."""
+    totals = (
+        completed_purchases()
+        .filter(purchase_date__gte=start_of(day), purchase_date__lt=start_of(day + timedelta(days=1)))
+        .aggregate(revenue=Sum('plan__price'), credits_sold=Sum('credits_granted'))
+    )
+    return {'revenue': totals['revenue'] or Decimal('0'), 'credits_sold': totals['credits_sold'] or 0}
+
+
+def add_live_day(rows, period, totals):
+    """Add a not-yet-rolled-up day's ``totals`` into the row for its ``period``."""
+    if not totals['revenue'] and not totals['credits_sold']:
+        return rows
+    if rows and rows[-1]['period'] == period:
+        rows[-1]['revenue'] += totals['revenue']
+        rows[-1]['credits_sold'] += totals['credits_sold']
+    else:
+        rows.append({'period': period, **totals})
+    return rows
+
+
+def revenue_breakdown(today=None):
+    """Last 7 days, last 8 weeks and last 12 months of revenue, including today."""
+    today = today or timezone.localdate()
+    week_start = today - timedelta(days=today.weekday())
+    # First day of the month eleven months back
+    year, month = divmod(today.year * 12 + today.month - 1 - 11, 12)
+    first_month = date(year, month + 1, 1)
+    # The rollup ends yesterday
+    live = live_revenue(today)
+
+    return {
+        'day': add_live_day(revenue_by_period('day', today - timedelta(days=6)), today, live),
+        'week': add_live_day(revenue_by_period('week', week_start - timedelta(weeks=7)), week_start, live),
+        'month': add_live_day(revenue_by_period('month', first_month), today.replace(day=1), live),
+    }
@@ -0,0 +1,77 @@
+# driving_school/scheduling.py
+"""
+Interval-based conflict checks for appointments.
+
+An appointment occupies the half-open interval
+``[scheduled_time, scheduled_time + duration_minutes)``, so back-to-back
+lessons do not conflict while any real overlap does, whatever the lesson
+length or start minute.
+"""
+from bisect import bisect_left
+from datetime import timedelta
+from django.utils import timezone
+from .models import MAX_LESSON_MINUTES, Appointment
+
+# Length of a lesson booked through the calendar
+LESSON_MINUTES = 120
+
+
+def appointment_end(appointment):
+    return appointment.scheduled_time + timedelta(minutes=appointment.duration_minutes)
+
+
+def day_minutes(appointment):
+    """Return an appointment's interval as minutes from local midnight."""
+    start = timezone.localtime(appointment.scheduled_time)
+    start_minute = start.hour * 60 + start.minute
+    return start_minute, start_minute + appointment.duration_minutes
+
+
+def overlapping_appointments(instructor_id, start, end, exclude_id=None):
+    """
+    Scheduled appointments of an instructor that overlap ``[start, end)``.
+
+    Only rows starting inside ``(start - MAX_LESSON_MINUTES, end)`` can
+    overlap, so the database answers with a range scan on
+    ``(instructor, scheduled_time)`` and the exact end check runs in Python.
+    """
+    candidates = Appointment.objects.filter(
+        instructor_id=instructor_id,
+        status='Scheduled',
+        scheduled_time__gt=start - timedelta(minutes=MAX_LESSON_MINUTES),
+        scheduled_time__lt=end,
+    ).only('scheduled_time', 'duration_minutes')
+    if exclude_id is not None:
+        candidates = candidates.exclude(id=exclude_id)
+    return [appointment for appointment in candidates if appointment_end(appointment) > start]
+
+
+def has_conflict(instructor_id, start, end, exclude_id=None):
+    return bool(overlapping_appointments(instructor_id, start, end, exclude_id))
+
+
+class DaySchedule:
+    """
+    One instructor's busy intervals for a day, in minutes from midnight.
+
+    Intervals are kept sorted by start with a running maximum of their ends,
+    so ``overlaps`` is a binary search rather than a scan of the day.
+    """
+
+    def __init__(self, intervals=()):
+        self.intervals = tuple(sorted(intervals))
+        self._starts = [start for start, _ in self.intervals]
+        self._max_ends = []
+        max_end = None
+        for _, end in self.intervals:
+            max_end = end if max_end is None else max(max_end, end)
+            self._max_ends.append(max_end)
+
+    @classmethod
+    def from_appointments(cls, appointments):
+        return cls(day_minutes(appointment) for appointment in appointments)
+
+    def overlaps(self, start, end):
+        """Whether ``[start, end)`` intersects any busy interval."""
+        index = bisect_left(self._starts, end)
+        return index > 0 and self._max_ends[index - 1] > start
@@ -0,0 +1,82 @@
+# driving_school/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from . import availability, cartbadge, catalog, images, pagecache, stats
+from .models import Appointment, Cart, CartItem, Instructor, LessonPlan, PlanFeature, Review, Student
+
+
+@receiver([post_save, post_delete], sender=LessonPlan)
+@receiver([post_save, post_delete], sender=PlanFeature)
+def invalidate_catalog(sender, **kwargs):
+    catalog.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Instructor)
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=LessonPlan)
+@receiver([post_save, post_delete], sender=PlanFeature)
+def purge_page_cache(sender, **kwargs):
+    pagecache.purge()
+
+
+@receiver(post_save, sender=Instructor)
+def refresh_instructor_photo(sender, instance, **kwargs):
+    if instance.photo:
+        images.forget(instance.photo)
+
+
+@receiver(post_save, sender=Review)
+def refresh_review_image(sender, instance, **kwargs):
+    if instance.image:
+        images.forget(instance.image)
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def refresh_cart_badge(sender, instance, **kwargs):
+    cartbadge.forget_cart(instance.cart_id)
+
+
+@receiver(post_save, sender=Cart)
+def refresh_cart_owner(sender, instance, created, **kwargs):
+    # A user without a cart is cached as 0; point them at the new one
+    if created:
+        cartbadge.forget_user(instance.student.user_id)
+
+
+@receiver(post_delete, sender=Cart)
+def forget_deleted_cart(sender, instance, **kwargs):
+    cartbadge.forget_cart(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+def count_new_student(sender, created, **kwargs):
+    if created:
+        stats.adjust('students', 1)
+
+
+@receiver(post_delete, sender=Student)
+def count_removed_student(sender, **kwargs):
+    stats.adjust('students', -1)
+
+
+@receiver([post_save, post_delete], sender=Instructor)
+def refresh_average_rating(sender, **kwargs):
+    # Averaging the small instructor table on the next read is cheap
+    stats.forget('average_rating')
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_appointment_slot(sender, instance, **kwargs):
+    # Where the stored row sat, so a moved lesson also frees its old day
+    stored = None
+    if not instance._state.adding:
+        stored = Appointment.objects.filter(pk=instance.pk).values_list('instructor_id', 'scheduled_time').first()
+    instance._previous_slot = (stored[0], availability.local_day(stored[1])) if stored else None
+
+
+@receiver([post_save, post_delete], sender=Appointment)
+def refresh_availability(sender, instance, **kwargs):
+    slots = {getattr(instance, '_previous_slot', None), availability.appointment_slot(instance)} - {None}
+    # After commit, so a concurrent read cannot re-cache the old rows
+    transaction.on_commit(lambda: availability.forget(slots))
@@ -0,0 +1,135 @@
+# driving_school/sms.py
+"""
+SMS notifications.
+
+Messages go through the outbound queue (see ``outbox.py``) and are delivered
+by the ``send_outbound_messages`` worker through the transport named in
+``settings.SMS_TRANSPORT``: ``TwilioTransport`` in production and
+``FakeTransport``, which only records messages, in tests and development.
+
+Admin alerts use a ``digest_key``: alerts for the same recipient and key are
+held for ``SMS_DIGEST_WINDOW_MINUTES`` and go out as one SMS, or as soon as
+``SMS_DIGEST_SIZE`` of them are waiting.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import OutboundMessage
+
+# Longest body Twilio accepts (it splits it into segments itself)
+MAX_LENGTH = 1600
+
+DIGEST_TITLES = {
+    'applications': 'new job applications',
+    'bookings': 'new lesson bookings',
+}
+
+
+class SMSTransport:
+    """Sends one SMS. Subclasses raise on failure so the queue can retry."""
+
+    def send(self, to, body):
+        raise NotImplementedError
+
+
+class TwilioTransport(SMSTransport):
+    def __init__(self):
+        try:
+            from twilio.rest import Client
+        except ImportError:
+            raise ImproperlyConfigured('TwilioTransport needs the twilio package installed')
+        self.client = Client(settings.TWILIO_SID, settings.TWILIO_AUTH_TOKEN)
+
+    def send(self, to, body):
+        self.client.messages.create(body=body, from_=settings.TWILIO_PHONE, to=to)
+
+
+class FakeTransport(SMSTransport):
+    """Keeps sent messages in ``FakeTransport.outbox``, like the locmem email backend."""
+    outbox = []
+
+    def send(self, to, body):
+        FakeTransport.outbox.append((to, body))
+
+
+def get_transport():
+    return import_string(settings.SMS_TRANSPORT)()
+
+
+def enqueue_sms(to, body, digest_key='', send_at=None):
+    """
+    Queue an SMS to ``to``. With a ``digest_key`` it joins the pending digest
+    for that recipient and key, which is released early once it is full.
+    """
+    now = timezone.now()
+    send_at = send_at or now
+    waiting = 0
+    if digest_key:
+        pending = OutboundMessage.objects.filter(channel='sms', status='pending', recipient=to, digest_key=digest_key)
+        digest = pending.aggregate(send_at=Min('next_attempt_at'), waiting=Count('id'))
+        # Join the open digest, or open one that closes after the window
+        send_at = digest['send_at'] or now + timedelta(minutes=settings.SMS_DIGEST_WINDOW_MINUTES)
+        waiting = digest['waiting']
+
+    message = OutboundMessage.objects.create(
+        channel='sms', recipient=to, body=body, digest_key=digest_key, next_attempt_at=send_at,
+    )
+    if digest_key and waiting + 1 >= settings.SMS_DIGEST_SIZE:
+        pending.update(next_attempt_at=now)
+    return message
+
+
+def digest_body(digest_key, messages):
+    if len(messages) == 1:
+        return messages[0].body
+    title = DIGEST_TITLES.get(digest_key, 'new notifications')
+    body = f"{len(messages)} {title}:\n" + '\n'.join(f"- {message.body}" for message in messages)
+    if len(body) > MAX_LENGTH:
+        body = body[:MAX_LENGTH - 1] + '…'
+    return body
+
+
+def send_batch(messages):
+    """Send queued SMS rows, one SMS per digest; return ``{message id: error}``."""
+    groups = defaultdict(list)
+    for message in messages:
+        # Rows without a digest key are sent on their own
+        groups[(message.recipient, message.digest_key or message.id)].append(message)
+
+    errors = {}
+    try:
+        transport = get_transport()
+    except Exception as e:
+        return {message.id: str(e) or e.__class__.__name__ for message in messages}
+
+    for (recipient, _), group in groups.items():
+        try:
+            transport.send(recipient, digest_body(group[0].digest_key, group))
+        except Exception as e:
+            for message in group:
+                errors[message.id] = str(e) or e.__class__.__name__
+    return errors
+
+
+def lesson_reminder_body(appointment):
+    when = timezone.localtime(appointment.scheduled_time)
+    return (
+        f"Success Driving reminder: your lesson with {appointment.instructor} is on "
+        f"{when:%a %b %d at %I:%M %p}. Need to change it? Reschedule from your student portal."
+    )
+
+
+def queue_lesson_reminders(appointments):
+    """
+    Queue one reminder per appointment to the student's phone with a single
+    insert. Students without a phone are skipped; returns the queued rows.
+    """
+    return OutboundMessage.objects.bulk_create([
+        OutboundMessage(channel='sms', recipient=appointment.student.phone, body=lesson_reminder_body(appointment))
+        for appointment in appointments
+        if appointment.student.phone
+    ])
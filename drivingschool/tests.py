@@ -1,3 +1,1119 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO
+from datetime import datetime, timedelta
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.template import Context, Template
+from django.utils import timezone
+from PIL import Image
+from . import assets, availability, cartbadge, catalog, images, outbox, pagecache, portal, reminders, reports, scheduling, sms, stats, uploads, urls
+from .forms import RegistrationForm
+from .models import *
 
-# Create your tests here.
+# Tests keep their own cache, so running them never clears or fills the site's
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'drivingschool-tests'},
+    'counters': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'drivingschool-tests-counters'},
+}
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+# Maximum queries per URL name, measured against the fixture below. The
+# fixture has many rows per relation, so an N+1 pushes a view over budget.
+QUERY_BUDGETS = {
+    'home': 2,
+    'lessons': 0,
+    'pricing': 2,
+    'dmv_test_help': 0,
+    'about': 1,
+    'contact': 0,
+    'careers': 0,
+    'register': 0,
+    'login': 10,
+    'logout': 4,
+    'dashboard': 3,
+    'plan_selection': 7,
+    'student_portal': 11,
+    'booking_page': 13,
+    'book_lesson': 12,
+    'cancel_appointment': 6,
+    'cancel_appointment_ajax': 6,
+    'reschedule_appointment': 9,
+    'add_to_cart': 6,
+    'add_to_cart_and_checkout': 6,
+    'view_cart': 7,
+    'remove_from_cart': 6,
+    'checkout_cart': 7,
+    'process_cart_payment': 12,
+    'purchase_plan': 5,
+    'payment_page': 7,
+    'select_plan': 5,
+    'checkout': 6,
+    'payment_success': 5,
+    'instructor_portal': 5,
+    'mark_complete': 6,
+    'mark_complete_bulk': 5,
+    'admin_dashboard': 13,
+    'chatbot_api': 0,
+    'get_available_slots': 2,
+    'get_available_slots_batch': 2,
+}
+
+# Generous wall-clock ceiling per request, in milliseconds
+RENDER_TIME_BUDGET_MS = 1000
+
+PASSWORD = 'Test1234!'
+
+
+@override_settings(CACHES=TEST_CACHES, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(TestCase):
+    """Every URL in drivingschool/urls.py must stay within its query and time budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+
+        cls.plans = []
+        for i, name in enumerate(['Quick Start', 'Momentum Drive', 'Confidence Cruise', 'Master the Road', 'Driven to Succeed', 'Test Day Champion']):
+            plan = LessonPlan.objects.create(
+                name=name,
+                hours=2 * (i + 1),
+                price=100 + 50 * i,
+                original_price=150 + 50 * i,
+                includes_test=name == 'Test Day Champion',
+                package_type='specialized' if name == 'Test Day Champion' else 'standard',
+                display_order=i,
+            )
+            for order in range(4):
+                PlanFeature.objects.create(plan=plan, feature_text=f'{name} feature {order}', order=order)
+            cls.plans.append(plan)
+
+        cls.instructors = []
+        for i in range(6):
+            user = User.objects.create_user(f'instructor{i}', f'instructor{i}@example.com', PASSWORD, first_name='Instructor', last_name=str(i))
+            cls.instructors.append(Instructor.objects.create(user=user, phone='4085550000', bio='Patient and calm.', rating=4.5 + i / 10))
+
+        cls.students = []
+        for i in range(25):
+            user = User.objects.create_user(f'student{i}', f'student{i}@example.com', PASSWORD, first_name='Student', last_name=str(i))
+            cls.students.append(Student.objects.create(user=user, total_credits=40, available_credits=40, state='California', zip_code='95050'))
+        cls.student = cls.students[0]
+
+        for plan in cls.plans[:4]:
+            StudentPlanPurchase.objects.create(student=cls.student, plan=plan, credits_granted=plan.hours, payment_status='completed', payment_id=f'PAY_{plan.id}')
+        cls.pending_purchase = StudentPlanPurchase.objects.create(student=cls.student, plan=cls.plans[0], credits_granted=2)
+
+        cart = Cart.objects.create(student=cls.student)
+        cls.cart_items = [CartItem.objects.create(cart=cart, plan=plan) for plan in cls.plans[:3]]
+
+        # A long lesson history for the main student and a busy first instructor
+        start = (now + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
+        for i in range(30):
+            past = i < 20
+            Appointment.objects.create(
+                student=cls.student,
+                instructor=cls.instructors[i % len(cls.instructors)],
+                scheduled_time=start - timedelta(days=3 * (i + 1)) if past else start + timedelta(days=2 * (i - 20)),
+                status='Completed' if past else 'Scheduled',
+                credits_used=2,
+                duration_minutes=120,
+                plan=cls.plans[0],
+            )
+        for i, student in enumerate(cls.students[1:]):
+            Appointment.objects.create(
+                student=student,
+                instructor=cls.instructors[0],
+                scheduled_time=start + timedelta(days=i, hours=4),
+                credits_used=2,
+                duration_minutes=120,
+            )
+        cls.upcoming = Appointment.objects.filter(student=cls.student, status='Scheduled').order_by('scheduled_time').last()
+        cls.instructor_appointment = Appointment.objects.filter(instructor=cls.instructors[0], status='Scheduled').first()
+
+        for i in range(6):
+            Review.objects.create(student=f'Reviewer {i}', instructor='Instructor 0', rating=5, comment='Great lessons.')
+        for i in range(3):
+            JobApplication.objects.create(first_name='Applicant', last_name=str(i), email=f'applicant{i}@example.com', cv='careers/cv.pdf')
+        for i in range(14):
+            DailyMetrics.objects.create(date=timezone.localdate() - timedelta(days=i + 1), bookings=i, revenue=100 * i)
+
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', PASSWORD)
+
+    def setUp(self):
+        # The cache outlives test transactions; start every test cold
+        clear_caches()
+
+    def assertWithinBudget(self, name, url, method='get', data=None, user=None, **extra):
+        if user is not None:
+            self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(url, data or {}, **extra)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        self.assertLess(response.status_code, 500, f'{name} failed')
+        self.assertLessEqual(
+            len(queries), QUERY_BUDGETS[name],
+            f"{name} ran {len(queries)} queries (budget {QUERY_BUDGETS[name]}):\n"
+            + '\n'.join(query['sql'] for query in queries.captured_queries),
+        )
+        self.assertLessEqual(elapsed_ms, RENDER_TIME_BUDGET_MS, f'{name} took {elapsed_ms:.0f} ms')
+        return response
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+
+    # Public pages
+
+    def test_home(self):
+        # refresh_site_stats keeps the counters warm; the page never counts tables
+        stats.refresh()
+        self.assertWithinBudget('home', reverse('home'))
+
+    def test_lessons(self):
+        self.assertWithinBudget('lessons', reverse('lessons'))
+
+    def test_pricing(self):
+        response = self.assertWithinBudget('pricing', reverse('pricing'))
+        self.assertContains(response, 'Test Day Champion feature 3')
+
+    def test_dmv_test_help(self):
+        self.assertWithinBudget('dmv_test_help', reverse('dmv_test_help'))
+
+    def test_about(self):
+        self.assertWithinBudget('about', reverse('about'))
+
+    def test_contact(self):
+        self.assertWithinBudget('contact', reverse('contact'))
+
+    def test_contact_enqueues_instead_of_sending(self):
+        self.client.post(reverse('contact'), {'name': 'Ana', 'email': 'ana@example.com', 'message': 'Hello'})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(OutboundMessage.objects.filter(recipient='admin@successdriving.com', reply_to='ana@example.com').exists())
+
+    def test_careers(self):
+        self.assertWithinBudget('careers', reverse('careers'))
+
+    def test_anonymous_pages_served_from_cache(self):
+        for name in ['home', 'lessons', 'pricing', 'dmv_test_help', 'about']:
+            self.client.get(reverse(name))
+            with self.assertNumQueries(0):
+                self.client.get(reverse(name))
+
+    def test_query_strings_bypass_the_page_cache(self):
+        self.client.get(reverse('pricing'))
+        with mock.patch('drivingschool.pagecache.cache.set') as cache_set:
+            for i in range(3):
+                self.client.get(reverse('pricing'), {'utm_source': f'ad{i}'})
+        self.assertFalse(any(call.args[0].startswith('pages:') for call in cache_set.call_args_list))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('pricing'))
+        self.assertContains(self.client.get(reverse('contact'), {'package': 'premium'}), 'Premium Package')
+        self.assertNotContains(self.client.get(reverse('contact')), 'Premium Package')
+
+    # Authentication
+
+    def test_register(self):
+        self.assertWithinBudget('register', reverse('register'))
+
+    def test_login(self):
+        response = self.assertWithinBudget('login', reverse('login'), 'post', {'username': 'student0', 'password': PASSWORD})
+        self.assertRedirects(response, reverse('student_portal'), fetch_redirect_response=False)
+
+    def test_login_with_email_ignores_case(self):
+        response = self.assertWithinBudget('login', reverse('login'), 'post', {'username': 'Student0@Example.com', 'password': PASSWORD})
+        self.assertRedirects(response, reverse('student_portal'), fetch_redirect_response=False)
+
+    def test_logout(self):
+        self.assertWithinBudget('logout', reverse('logout'), user=self.student.user)
+
+    def test_dashboard(self):
+        self.assertWithinBudget('dashboard', reverse('dashboard'), user=self.student.user)
+
+    def test_plan_selection(self):
+        self.assertWithinBudget('plan_selection', reverse('plan_selection'), user=self.student.user)
+
+    # Student
+
+    def test_student_portal(self):
+        self.assertWithinBudget('student_portal', reverse('student_portal'), user=self.student.user)
+
+    def test_student_portal_paginates_appointments(self):
+        response = self.assertWithinBudget('student_portal', reverse('student_portal'), data={'page': 3}, user=self.student.user)
+        page = response.context['appointments']
+        self.assertEqual(page.number, 3)
+        self.assertEqual(page.paginator.num_pages, 3)
+        self.assertEqual(response.context['completed'], 20)
+        self.assertEqual(response.context['cart_items_count'], 3)
+
+    def test_booking_page(self):
+        self.assertWithinBudget('booking_page', reverse('booking_page'), user=self.student.user)
+
+    def test_book_lesson(self):
+        day = timezone.localdate() + timedelta(days=40)
+        response = self.assertWithinBudget('book_lesson', reverse('book_lesson'), 'post', {
+            'selected_date': day.isoformat(),
+            'selected_time': '09:00',
+            'selected_instructor': self.instructors[1].id,
+        }, user=self.student.user)
+        self.assertRedirects(response, reverse('student_portal'), fetch_redirect_response=False)
+
+    def test_cancel_appointment(self):
+        response = self.assertWithinBudget('cancel_appointment', reverse('cancel_appointment', args=[self.upcoming.id]), 'post', user=self.student.user)
+        self.assertTrue(response.json()['success'])
+
+    def test_cancel_appointment_ajax(self):
+        response = self.assertWithinBudget('cancel_appointment_ajax', reverse('cancel_appointment_ajax'), 'post', {'appointment_id': self.upcoming.id}, user=self.student.user)
+        self.assertTrue(response.json()['success'])
+
+    def test_reschedule_appointment(self):
+        day = timezone.localdate() + timedelta(days=45)
+        response = self.assertWithinBudget('reschedule_appointment', reverse('reschedule_appointment'), 'post', {
+            'appointment_id': self.upcoming.id,
+            'new_date': day.isoformat(),
+            'new_time': '13:00',
+            'instructor_id': self.instructors[2].id,
+        }, user=self.student.user)
+        self.assertTrue(response.json()['success'])
+
+    def test_add_to_cart(self):
+        self.assertWithinBudget('add_to_cart', reverse('add_to_cart', args=[self.plans[4].id]), user=self.student.user)
+
+    def test_add_to_cart_and_checkout(self):
+        self.assertWithinBudget('add_to_cart_and_checkout', reverse('add_to_cart_and_checkout', args=['driven-to-succeed']), user=self.student.user)
+
+    def test_view_cart(self):
+        self.assertWithinBudget('view_cart', reverse('view_cart'), user=self.student.user)
+
+    def test_cart_totals_in_one_query(self):
+        plans = self.plans[:3]
+        with self.assertNumQueries(1):
+            cart = Cart.objects.with_totals().get(student=self.student)
+            self.assertEqual(cart.get_totals(), (3, sum(p.price for p in plans), sum(p.hours for p in plans)))
+        empty = Cart.objects.create(student=self.students[1])
+        self.assertEqual(empty.get_totals(), (0, 0, 0))
+
+    def test_cart_badge_cached_until_cart_changes(self):
+        user_id = self.student.user_id
+        with self.assertNumQueries(2):
+            self.assertEqual(cartbadge.item_count(user_id), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(cartbadge.item_count(user_id), 3)
+        self.cart_items[0].delete()
+        self.assertEqual(cartbadge.item_count(user_id), 2)
+
+        other = self.students[1]
+        self.assertEqual(cartbadge.item_count(other.user_id), 0)
+        CartItem.objects.create(cart=Cart.objects.create(student=other), plan=self.plans[0])
+        self.assertEqual(cartbadge.item_count(other.user_id), 1)
+
+    def test_remove_from_cart(self):
+        self.assertWithinBudget('remove_from_cart', reverse('remove_from_cart', args=[self.cart_items[0].id]), user=self.student.user)
+
+    def test_checkout_cart(self):
+        self.assertWithinBudget('checkout_cart', reverse('checkout_cart'), user=self.student.user)
+
+    def test_process_cart_payment(self):
+        self.assertWithinBudget('process_cart_payment', reverse('process_cart_payment'), 'post', {'order_key': 'order-1'}, user=self.student.user)
+        self.assertFalse(CartItem.objects.filter(cart__student=self.student).exists())
+
+    def test_process_cart_payment_is_idempotent(self):
+        self.client.force_login(self.student.user)
+        hours = sum(item.plan.hours for item in CartItem.objects.filter(cart__student=self.student))
+        for _ in range(2):
+            self.client.post(reverse('process_cart_payment'), {'order_key': 'order-1'})
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.available_credits, 40 + hours)
+        purchases = StudentPlanPurchase.objects.filter(order_key='order-1')
+        self.assertEqual(purchases.count(), 3)
+        self.assertEqual(len({purchase.payment_id for purchase in purchases}), 1)
+
+    def test_purchase_plan(self):
+        self.assertWithinBudget('purchase_plan', reverse('purchase_plan', args=[self.plans[1].id]), user=self.student.user)
+
+    def test_payment_page(self):
+        self.assertWithinBudget('payment_page', reverse('payment_page', args=[self.pending_purchase.id]), user=self.student.user)
+
+    def test_payment_page_grants_credits_once(self):
+        self.client.force_login(self.student.user)
+        for _ in range(2):
+            self.client.post(reverse('payment_page', args=[self.pending_purchase.id]))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.available_credits, 40 + self.pending_purchase.credits_granted)
+
+    # Payment
+
+    def test_select_plan(self):
+        self.assertWithinBudget('select_plan', reverse('select_plan', args=['standard']), user=self.student.user)
+
+    def test_checkout(self):
+        self.assertWithinBudget('checkout', reverse('checkout', args=[self.plans[0].id]), user=self.student.user)
+
+    def test_payment_success(self):
+        self.assertWithinBudget('payment_success', reverse('payment_success'), data={'plan_id': self.plans[0].id}, user=self.student.user)
+
+    # Instructor
+
+    def test_instructor_portal(self):
+        self.assertWithinBudget('instructor_portal', reverse('instructor_portal'), user=self.instructors[0].user)
+
+    def test_instructor_portal_windows(self):
+        today = timezone.localdate()
+        for data in [
+            {'window': 'today'},
+            {'window': 'history'},
+            {'window': 'range', 'start': today.isoformat(), 'end': (today + timedelta(days=60)).isoformat()},
+        ]:
+            response = self.assertWithinBudget('instructor_portal', reverse('instructor_portal'), data=data, user=self.instructors[0].user)
+            self.assertEqual(response.context['window'], data['window'])
+        history = self.client.get(reverse('instructor_portal'), {'window': 'history'})
+        self.assertTrue(all(appt.status == 'Completed' for appt in history.context['appointments']))
+
+    def test_instructor_schedule_keyset_pages(self):
+        instructor_id = self.instructors[0].id
+        expected = list(Appointment.objects.filter(instructor_id=instructor_id).order_by('scheduled_time', 'id'))
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                page, cursor = portal.instructor_schedule(instructor_id, after=cursor, limit=7)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_mark_complete(self):
+        self.assertWithinBudget('mark_complete', reverse('mark_complete', args=[self.instructor_appointment.id]), user=self.instructors[0].user)
+
+    def test_mark_complete_bulk(self):
+        instructor = self.instructors[0]
+        ids = list(Appointment.objects.filter(instructor=instructor, status='Scheduled').values_list('id', flat=True)[:6])
+        other = Appointment.objects.exclude(instructor=instructor).filter(status='Scheduled').first()
+        response = self.assertWithinBudget('mark_complete_bulk', reverse('mark_complete_bulk'), 'post', {'appt_ids': ids + [other.id]}, user=instructor.user)
+        self.assertRedirects(response, reverse('instructor_portal'), fetch_redirect_response=False)
+        self.assertEqual(Appointment.objects.filter(id__in=ids, status='Completed').count(), 6)
+        other.refresh_from_db()
+        self.assertEqual(other.status, 'Scheduled')
+
+    def test_close_past_appointments(self):
+        past = timezone.now() - timedelta(days=2)
+        stale = [
+            Appointment.objects.create(student=self.students[i], instructor=self.instructors[1], scheduled_time=past - timedelta(hours=3 * i))
+            for i in range(1, 6)
+        ]
+        call_command('close_past_appointments', '--mark', 'no-show', '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(Appointment.objects.filter(id__in=[a.id for a in stale], status='No-show').count(), 5)
+        self.assertFalse(Appointment.objects.filter(status='Scheduled', scheduled_time__lt=timezone.now() - timedelta(hours=12)).exists())
+        self.assertTrue(Appointment.objects.filter(id=self.upcoming.id, status='Scheduled').exists())
+
+    # Admin
+
+    def test_admin_dashboard(self):
+        self.assertWithinBudget('admin_dashboard', reverse('admin_dashboard'), user=self.admin)
+
+    # API
+
+    def test_chatbot_api(self):
+        self.assertWithinBudget('chatbot_api', reverse('chatbot_api'), 'post', '{"message": "hello"}', content_type='application/json')
+
+    def test_get_available_slots(self):
+        day = self.instructor_appointment.scheduled_time.date()
+        self.assertWithinBudget('get_available_slots', reverse('get_available_slots'), data={'instructor_id': self.instructors[0].id, 'date': day.isoformat()})
+
+    def test_get_available_slots_batch(self):
+        start = timezone.localdate()
+        response = self.assertWithinBudget('get_available_slots_batch', reverse('get_available_slots_batch'), data={
+            'start': start.isoformat(),
+            'end': (start + timedelta(days=30)).isoformat(),
+        })
+        self.assertEqual(len(response.json()['instructors']), len(self.instructors))
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP server unavailable')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class OutboxTests(TestCase):
+    def test_worker_sends_queued_email(self):
+        outbox.enqueue_email(['a@example.com', 'b@example.com'], 'Subject', 'Body', reply_to='visitor@example.com')
+        call_command('send_outbound_messages', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), ['a@example.com', 'b@example.com'])
+        self.assertEqual(mail.outbox[0].reply_to, ['visitor@example.com'])
+        self.assertEqual(OutboundMessage.objects.filter(status='sent').count(), 2)
+
+    @override_settings(EMAIL_BACKEND='drivingschool.tests.FailingEmailBackend')
+    def test_failures_back_off_then_give_up(self):
+        message = outbox.enqueue_email('a@example.com', 'Subject', 'Body')[0]
+        now = timezone.now()
+        self.assertEqual(outbox.deliver_due(now=now), (0, 1, 0))
+        message.refresh_from_db()
+        self.assertEqual(message.next_attempt_at, now + timedelta(minutes=1))
+        self.assertIn('SMTP server unavailable', message.last_error)
+        # Not due again until the backoff has passed
+        self.assertEqual(outbox.deliver_due(now=now + timedelta(seconds=30)), (0, 0, 0))
+
+        for attempt in range(2, outbox.MAX_ATTEMPTS + 1):
+            now = message.next_attempt_at
+            outbox.deliver_due(now=now)
+            message.refresh_from_db()
+        self.assertEqual(message.status, 'failed')
+        self.assertEqual(message.attempts, outbox.MAX_ATTEMPTS)
+
+    def test_workers_never_share_a_message(self):
+        messages = outbox.enqueue_email(['a@example.com', 'b@example.com'], 'Subject', 'Body')
+        ids = [message.id for message in messages]
+        now = timezone.now()
+        self.assertEqual(len(outbox.claim_batch(10, now)), 2)
+        # A second worker that read the same rows before the first claimed them (no row locks on SQLite)
+        with mock.patch('drivingschool.outbox.lock_batch', return_value=ids):
+            self.assertEqual(outbox.claim_batch(10, now), [])
+        self.assertEqual(outbox.deliver_due(now=now), (0, 0, 0))
+        self.assertEqual(mail.outbox, [])
+
+        # A worker that died mid-batch gives its rows up once the claim lapses
+        self.assertEqual(outbox.deliver_due(now=now + timedelta(seconds=outbox.CLAIM_SECONDS)), (2, 0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+
+@override_settings(CACHES=TEST_CACHES, SMS_TRANSPORT='drivingschool.sms.FakeTransport', SMS_DIGEST_SIZE=3, SMS_DIGEST_WINDOW_MINUTES=15)
+class SMSTests(TestCase):
+    def setUp(self):
+        sms.FakeTransport.outbox.clear()
+
+    def test_alerts_are_batched_into_one_digest(self):
+        for name in ['Ana', 'Ben']:
+            sms.enqueue_sms('+15550100', f'{name} Applicant', digest_key='applications')
+        now = timezone.now()
+        self.assertEqual(outbox.deliver_due(now=now), (0, 0, 0))
+        self.assertEqual(outbox.deliver_due(now=now + timedelta(minutes=16)), (2, 0, 0))
+        self.assertEqual(sms.FakeTransport.outbox, [('+15550100', '2 new job applications:\n- Ana Applicant\n- Ben Applicant')])
+
+    def test_full_digest_is_released_early(self):
+        for i in range(3):
+            sms.enqueue_sms('+15550100', f'Booking {i}', digest_key='bookings')
+        self.assertEqual(outbox.deliver_due(), (3, 0, 0))
+        self.assertEqual(len(sms.FakeTransport.outbox), 1)
+        self.assertTrue(sms.FakeTransport.outbox[0][1].startswith('3 new lesson bookings:'))
+
+    def test_lesson_reminder(self):
+        student = Student.objects.create(user=User.objects.create(username='student'), phone='+15550101')
+        instructor = Instructor.objects.create(user=User.objects.create(username='instructor', first_name='Ida', last_name='Drive'), phone='0', bio='')
+        appointment = Appointment.objects.create(student=student, instructor=instructor, scheduled_time=timezone.now() + timedelta(days=1))
+        sms.queue_lesson_reminders([appointment])
+        outbox.deliver_due()
+        to, body = sms.FakeTransport.outbox[0]
+        self.assertEqual(to, '+15550101')
+        self.assertIn('Ida Drive', body)
+
+
+@override_settings(CACHES=TEST_CACHES, SMS_TRANSPORT='drivingschool.sms.FakeTransport')
+class ReminderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        student = Student.objects.create(user=User.objects.create(username='student'), phone='+15550101')
+        instructor = Instructor.objects.create(user=User.objects.create(username='instructor'), phone='0', bio='')
+        cls.now = timezone.now()
+        cls.lessons = {
+            hours: Appointment.objects.create(student=student, instructor=instructor, scheduled_time=cls.now + timedelta(hours=hours))
+            for hours in [1, 5, 23, 30]
+        }
+
+    def test_each_kind_queues_its_window_once(self):
+        self.assertEqual(reminders.send_due('24h', batch_size=1, now=self.now), 1)
+        self.assertEqual(reminders.send_due('24h', now=self.now), 1)
+        self.assertEqual(reminders.send_due('2h', now=self.now), 1)
+        self.assertEqual(reminders.send_due('24h', now=self.now), 0)
+        self.assertEqual(reminders.send_due('2h', now=self.now), 0)
+
+        reminded = Appointment.objects.filter(reminder_24h_sent_at__isnull=False)
+        self.assertEqual({a.id for a in reminded}, {self.lessons[5].id, self.lessons[23].id})
+        self.assertIsNotNone(Appointment.objects.get(id=self.lessons[1].id).reminder_2h_sent_at)
+        self.assertEqual(OutboundMessage.objects.filter(channel='sms', recipient='+15550101').count(), 3)
+
+    def test_command_queues_all_due_reminders(self):
+        call_command('send_lesson_reminders', stdout=StringIO())
+        self.assertEqual(OutboundMessage.objects.filter(channel='sms').count(), 3)
+        self.assertIsNone(Appointment.objects.get(id=self.lessons[30].id).reminder_24h_sent_at)
+
+
+PDF = b'%PDF-1.4\n1 0 obj << /Length 44 >>\nstream\nBT /F1 12 Tf (Hello Driving School) Tj ET\nendstream\nendobj\n%%EOF\n'
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CVUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, CV_MAX_UPLOAD_SIZE=1024)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def apply(self, name, content):
+        return self.client.post(reverse('careers'), {
+            'first_name': 'Ana', 'last_name': 'Applicant', 'email': 'ana@example.com', 'phone': '555',
+            'cv': SimpleUploadedFile(name, content, content_type='application/pdf'),
+        })
+
+    def test_identical_cvs_are_stored_once(self):
+        self.apply('resume.pdf', PDF)
+        self.apply('resume-copy.pdf', PDF)
+        first, second = JobApplication.objects.order_by('id')
+        self.assertEqual(first.cv.name, second.cv.name)
+        self.assertEqual(first.cv.name, f'careers/{first.cv_sha256[:2]}/{first.cv_sha256}.pdf')
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'careers', first.cv_sha256[:2])), [f'{first.cv_sha256}.pdf'])
+        self.assertEqual(OutboundMessage.objects.filter(digest_key='applications').count(), 2)
+
+    def test_concurrent_save_of_same_cv_keeps_one_file(self):
+        storage = uploads.ContentAddressedStorage(location=self.media_root)
+        name = storage.save('careers/ab/abc.pdf', ContentFile(PDF))
+        # Another request saved the same bytes after this one checked exists()
+        results = []
+        with mock.patch.object(uploads.ContentAddressedStorage, 'exists', return_value=False):
+            worker = threading.Thread(target=lambda: results.append(storage.save(name, ContentFile(PDF))), daemon=True)
+            worker.start()
+            worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(results, [name])
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'careers', 'ab')), ['abc.pdf'])
+        with storage.open(name) as f:
+            self.assertEqual(f.read(), PDF)
+
+    def test_rejects_oversized_and_mislabelled_files(self):
+        response = self.apply('resume.pdf', PDF + b'0' * 2048)
+        self.assertContains(response, 'Files must be smaller than')
+        response = self.apply('resume.pdf', b'MZ not really a pdf')
+        self.assertContains(response, 'do not match its type')
+        response = self.apply('resume.exe', PDF)
+        self.assertContains(response, 'Please upload a PDF or Word document.')
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_extract_cv_text(self):
+        self.apply('resume.pdf', PDF)
+        call_command('extract_cv_text', stdout=StringIO())
+        application = JobApplication.objects.get()
+        self.assertIn('Hello Driving School', application.cv_text)
+        self.assertIsNotNone(application.cv_processed_at)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def review_with_image(self, size=(800, 600), mode='RGBA'):
+        buffer = BytesIO()
+        Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(buffer, 'PNG')
+        return Review.objects.create(
+            student='Pic', instructor='Sam', rating=5, comment='Great',
+            image=SimpleUploadedFile('face.png', buffer.getvalue(), content_type='image/png'),
+        )
+
+    def test_builds_webp_and_jpeg_variants_once(self):
+        review = self.review_with_image()
+        manifest = images.variants(review.image)
+        self.assertEqual((manifest['width'], manifest['height']), (800, 600))
+        self.assertEqual([w for w, _ in manifest['webp']], [160, 320, 640, 800])
+        self.assertEqual([w for w, _ in manifest['jpeg']], [160, 320, 640, 800])
+        files = os.listdir(os.path.dirname(os.path.join(self.media_root, manifest['jpeg'][0][1][len('/media/'):])))
+        self.assertEqual(len(files), 8)
+        with Image.open(os.path.join(self.media_root, manifest['webp'][1][1][len('/media/'):])) as webp:
+            self.assertEqual((webp.format, webp.size), ('WEBP', (320, 240)))
+
+        # The manifest is cached; later renders do not read the source again
+        os.remove(review.image.path)
+        self.assertEqual(images.variants(review.image), manifest)
+
+    def test_rebuild_only_resizes_missing_sizes(self):
+        review = self.review_with_image()
+        data = review.image.read()
+        manifest = images.build(data)
+        with mock.patch.object(Image.Image, 'resize', side_effect=AssertionError('resized')):
+            self.assertEqual(images.build(data), manifest)
+
+        os.remove(os.path.join(self.media_root, manifest['webp'][1][1][len('/media/'):]))
+        with mock.patch.object(Image.Image, 'resize', autospec=True, side_effect=Image.Image.resize) as resize:
+            self.assertEqual(images.build(data), manifest)
+        # Pillow resizes RGBA through a premultiplied copy, so one size may show up twice
+        self.assertEqual({call.args[1] for call in resize.call_args_list}, {(320, 240)})
+
+    def test_template_tag_emits_srcset(self):
+        review = self.review_with_image(size=(200, 100), mode='RGB')
+        html = Template('{% load responsive_images %}{% responsive_image image alt="Pic" sizes="60px" %}').render(
+            Context({'image': review.image})
+        )
+        self.assertIn('<source type="image/webp" srcset="/media/derivatives/', html)
+        self.assertIn('-160.webp 160w, /media/derivatives/', html)
+        self.assertIn('-200.jpg 200w" sizes="60px" width="200" height="100" alt="Pic"', html)
+
+    def test_unreadable_image_falls_back_to_original(self):
+        review = self.review_with_image()
+        with open(review.image.path, 'wb') as f:
+            f.write(b'not an image')
+        html = Template('{% load responsive_images %}{% responsive_image image %}').render(Context({'image': review.image}))
+        self.assertIn(f'<img src="{review.image.url}"', html)
+        self.assertNotIn('<picture>', html)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AssetBuildTests(TestCase):
+    def test_minify_and_prune_css(self):
+        css = assets.minify_css("""
+            /* layout */
+            .navbar, .never-used-anywhere > a { color: red; }
+            @media (max-width: 768px) { .never-used-anywhere { display: none; } }
+            .alert-success { content: "a  b"; }
+        """)
+        self.assertEqual(css, '.navbar,.never-used-anywhere>a{color:red}@media (max-width:768px){.never-used-anywhere{display:none}}.alert-success{content:"a  b"}')
+        self.assertEqual(assets.prune_css(css, {'navbar'}, ['alert-']), '.navbar{color:red}.alert-success{content:"a  b"}')
+
+    def test_collectstatic_builds_hashed_compressed_assets(self):
+        source, static_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, static_root)
+        os.makedirs(os.path.join(source, 'css'))
+        # Built at runtime so the class name is not a word in this file either
+        unused = 'stale-' + 'banner'
+        with open(os.path.join(source, 'css', 'site.css'), 'w') as f:
+            f.write(f'.navbar {{ color: red; }}\n.{unused} {{ color: blue; }}\n' * 20)
+
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'drivingschool.assets.AssetStorage'},
+        }
+        with override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=static_root, STORAGES=storages,
+                               STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder']):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = Template("{% load static %}{% static 'css/site.css' %}").render(Context())
+            self.assertRegex(url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Type'], 'text/css')
+            self.assertEqual(response['Cache-Control'], assets.IMMUTABLE)
+            body = b''.join(response.streaming_content)
+            response.close()
+            self.assertEqual(gzip.decompress(body), b'.navbar{color:red}' * 20)
+
+            response = self.client.get('/static/css/site.css')
+            self.assertNotIn('Content-Encoding', response)
+            self.assertEqual(response['Cache-Control'], assets.REVALIDATE)
+            response.close()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.plan = LessonPlan.objects.create(name='Quick Start', hours=2, price=100, package_type='standard')
+        user = User.objects.create_user('fragments', password=PASSWORD)
+        Student.objects.create(user=user)
+        self.client.force_login(user)
+
+    def test_plan_fragments_follow_catalog_and_auth_state(self):
+        self.assertContains(self.client.get(reverse('pricing')), 'Select This Plan')
+        self.plan.name = 'Quick Start Plus'
+        self.plan.save()
+        self.assertContains(self.client.get(reverse('pricing')), 'Quick Start Plus')
+
+        self.client.logout()
+        response = self.client.get(reverse('pricing'))
+        self.assertContains(response, 'Register to Select')
+        self.assertNotContains(response, 'Select This Plan')
+
+    def test_about_fragment_skips_review_queries_when_warm(self):
+        Review.objects.create(student='Ana', instructor='Sam', rating=5, comment='Patient teacher')
+        self.assertContains(self.client.get(reverse('about')), 'Patient teacher')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertContains(self.client.get(reverse('about')), 'Patient teacher')
+        self.assertFalse([q for q in queries if 'drivingschool_review' in q['sql']])
+
+        Review.objects.create(student='Bo', instructor='Sam', rating=4, comment='Very clear')
+        self.assertContains(self.client.get(reverse('about')), 'Very clear')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SiteStatsTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.instructor = Instructor.objects.create(user=User.objects.create_user('teacher'), rating=4.0)
+
+    def student(self, name):
+        return Student.objects.create(user=User.objects.create_user(name))
+
+    def test_counters_follow_signals_and_completions(self):
+        self.student('first')
+        self.assertEqual(stats.refresh()['students'], 1)
+        ana = self.student('ana')
+        self.assertEqual(stats.site_stats()['students'], 2)
+        ana.delete()
+        self.assertEqual(stats.site_stats()['students'], 1)
+
+        self.instructor.rating = 5.0
+        self.instructor.save()
+        self.assertEqual(stats.site_stats()['average_rating'], 5.0)
+
+        appointment = Appointment.objects.create(student=Student.objects.get(), instructor=self.instructor, scheduled_time=timezone.now() - timedelta(days=1))
+        availability.close_appointments(Appointment.objects.filter(id=appointment.id), 'Completed')
+        with self.assertNumQueries(0):
+            self.assertEqual(stats.site_stats()['completed_lessons'], 1)
+
+    def test_counters_written_by_another_process_are_shown(self):
+        # Cron commands run in their own process; the home page must see what they cache
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        shared = {
+            alias: {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': os.path.join(location, alias)}
+            for alias in TEST_CACHES
+        }
+        settings_override = override_settings(CACHES=shared)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        subprocess.run(
+            [sys.executable, '-c', 'import json, sys, django; django.setup(); '
+             'from django.test import override_settings; override_settings(CACHES=json.loads(sys.argv[1])).enable(); '
+             'from drivingschool import stats; from django.core.cache import caches; '
+             'caches["counters"].set_many({stats.key("students"): 4321, stats.key("completed_lessons"): 765, '
+             'stats.key("average_rating"): 4.7, stats.key("pass_rate"): 91})', json.dumps(shared)],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'successdriving.settings'}, check=True,
+        )
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'data-target="4321"')
+        self.assertContains(response, 'data-target="765"')
+        self.assertContains(response, 'data-target="91%"')
+        self.assertContains(self.client.get(reverse('lessons')), '4.7⭐')
+
+    def test_versions_and_counters_outlive_a_full_default_cache(self):
+        small = {**TEST_CACHES, 'default': {**TEST_CACHES['default'], 'OPTIONS': {'MAX_ENTRIES': 10}}}
+        with self.settings(CACHES=small):
+            stats.refresh()
+            versions = catalog.version(), pagecache.version()
+            for i in range(100):
+                cache.set(f'filler:{i}', i)
+            self.assertEqual((catalog.version(), pagecache.version()), versions)
+            with self.assertNumQueries(0):
+                stats.site_stats()
+
+    def test_home_fragment_follows_counters(self):
+        self.user = User.objects.create_user('member', password='pw')
+        self.client.login(username='member', password='pw')
+        stats.refresh()
+        self.assertContains(self.client.get(reverse('home')), 'data-target="0"')
+        self.student('ana')
+        self.assertContains(self.client.get(reverse('home')), 'data-target="1"')
+
+    def test_pass_rate_counts_first_attempts(self):
+        self.assertEqual(stats.pass_rate(), stats.FALLBACK_PASS_RATE)
+        now = timezone.now()
+        for name, results in [('ana', [False, True]), ('bo', [True]), ('cy', [True]), ('di', [False])]:
+            student = self.student(name)
+            for days, passed in enumerate(results):
+                Appointment.objects.create(student=student, instructor=self.instructor, scheduled_time=now + timedelta(days=days), status='Completed', test_passed=passed)
+        self.assertEqual(stats.pass_rate(), 50)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class EmailLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', 'Ana@Example.com', PASSWORD)
+
+    def test_password_is_hashed_once_per_attempt(self):
+        with mock.patch.object(User, 'check_password', autospec=True, return_value=False) as check:
+            self.assertIsNone(authenticate(username='ana@example.com', password='wrong'))
+        check.assert_called_once()
+        with mock.patch.object(User, 'set_password', autospec=True) as set_password:
+            self.assertIsNone(authenticate(username='nobody@example.com', password=PASSWORD))
+        set_password.assert_called_once()
+        self.assertEqual(authenticate(username='ANA@example.com', password=PASSWORD), self.user)
+
+    def test_username_match_wins_over_email(self):
+        other = User.objects.create_user('ana@example.org', 'someone@example.com', 'Other1234!')
+        User.objects.filter(pk=self.user.pk).update(email='ana@example.org')
+        self.assertEqual(authenticate(username='ana@example.org', password='Other1234!'), other)
+
+    def test_emails_are_unique_ignoring_case(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user('ana2', 'ANA@example.com', PASSWORD)
+        # Accounts without an email never collide
+        User.objects.create_user('blank1', '', PASSWORD)
+        User.objects.create_user('blank2', '', PASSWORD)
+
+        form = RegistrationForm({
+            'first_name': 'Ana', 'last_name': 'B', 'email': 'ana@EXAMPLE.com', 'username': 'ana3', 'password': PASSWORD,
+            'phone': '555', 'state': 'California', 'zip_code': '95050',
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DailyMetricsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+        self.instructor = Instructor.objects.create(user=User.objects.create_user('teacher'))
+        self.student = Student.objects.create(user=User.objects.create_user('learner'))
+        self.plan = LessonPlan.objects.create(name='Quick Start', hours=4, price=200, package_type='standard')
+
+    def lesson(self, day, hour, status, credits=2):
+        return Appointment.objects.create(
+            student=self.student, instructor=self.instructor, status=status, credits_used=credits,
+            scheduled_time=reports.start_of(day) + timedelta(hours=hour),
+        )
+
+    def purchase(self, day, status='completed'):
+        purchase = StudentPlanPurchase.objects.create(student=self.student, plan=self.plan, credits_granted=4, payment_status=status)
+        StudentPlanPurchase.objects.filter(pk=purchase.pk).update(purchase_date=reports.start_of(day) + timedelta(hours=10))
+
+    def test_compute_daily_metrics_fills_every_column(self):
+        self.lesson(self.yesterday, 9, 'Completed')
+        self.lesson(self.yesterday, 11, 'Completed', credits=1)
+        self.lesson(self.yesterday, 13, 'Cancelled')
+        self.lesson(self.yesterday, 15, 'No-show')
+        self.lesson(self.yesterday, 17, 'Scheduled')
+        self.purchase(self.yesterday)
+        self.purchase(self.yesterday)
+        self.purchase(self.yesterday, status='pending')
+
+        quiet, busy = reports.compute_daily_metrics(self.yesterday - timedelta(days=1), self.yesterday)
+        self.assertEqual((quiet.bookings, quiet.revenue), (0, 0))
+        self.assertEqual(
+            (busy.date, busy.bookings, busy.completed, busy.cancellations, busy.no_shows,
+             busy.credits_sold, busy.credits_consumed, busy.revenue),
+            (self.yesterday, 5, 2, 1, 1, 8, 3, 400),
+        )
+
+    def test_rollup_recomputes_recent_days(self):
+        late = self.lesson(self.yesterday, 16, 'Scheduled')
+        call_command('rollup_daily_metrics', stdout=StringIO())
+        self.assertEqual(DailyMetrics.objects.get(date=self.yesterday).completed, 0)
+
+        # Closed the next morning, after the first rollup
+        Appointment.objects.filter(pk=late.pk).update(status='Completed')
+        call_command('rollup_daily_metrics', stdout=StringIO())
+        metrics = DailyMetrics.objects.get(date=self.yesterday)
+        self.assertEqual((metrics.completed, metrics.credits_consumed), (1, 2))
+
+    def test_revenue_breakdown_includes_today(self):
+        self.purchase(self.yesterday)
+        call_command('rollup_daily_metrics', stdout=StringIO())
+        self.purchase(self.today)
+
+        breakdown = reports.revenue_breakdown(self.today)
+        self.assertEqual([(row['period'], row['revenue']) for row in breakdown['day']], [(self.yesterday, 200), (self.today, 200)])
+        self.assertEqual(sum(row['revenue'] for row in breakdown['month']), 400)
+        self.assertEqual(breakdown['week'][-1]['credits_sold'], 8 if self.today.weekday() else 4)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AvailabilityIndexTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.instructor = Instructor.objects.create(user=User.objects.create_user('teacher'))
+        self.student = Student.objects.create(user=User.objects.create_user('learner'))
+        self.day = timezone.localdate() + timedelta(days=3)
+
+    def slots(self, day=None):
+        response = self.client.get(reverse('get_available_slots'), {
+            'instructor_id': self.instructor.id, 'date': (day or self.day).isoformat(),
+        })
+        return response.json()['available_slots']
+
+    def at(self, day, hour):
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+
+    def test_edits_outside_the_views_refresh_the_index(self):
+        self.assertIn('10:00', self.slots())
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = Appointment.objects.create(student=self.student, instructor=self.instructor, scheduled_time=self.at(self.day, 10))
+        self.assertNotIn('10:00', self.slots())
+
+        # Moving a lesson, as the admin can, frees the old day and takes the new one
+        later = self.day + timedelta(days=1)
+        self.assertIn('10:00', self.slots(later))
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.scheduled_time = self.at(later, 10)
+            appointment.save()
+        self.assertIn('10:00', self.slots())
+        self.assertNotIn('10:00', self.slots(later))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Appointment.objects.filter(id=appointment.id).get().delete()
+        self.assertIn('10:00', self.slots(later))
+
+    def test_batch_only_builds_days_missing_from_the_index(self):
+        other = Instructor.objects.create(user=User.objects.create_user('second'))
+        ids, end = [self.instructor.id, other.id], self.day + timedelta(days=6)
+        availability.busy_schedule(self.instructor.id, self.day)
+        with mock.patch('drivingschool.availability.cache.set_many', wraps=availability.cache.set_many) as set_many:
+            schedules = availability.load_range(ids, self.day, end)
+        self.assertEqual(len(schedules), 14)
+        self.assertEqual(len(set_many.call_args.args[0]), 13)
+
+        # A warm range is read back without queries or writes
+        with self.assertNumQueries(0), mock.patch('drivingschool.availability.cache.set_many') as set_many:
+            self.assertEqual(availability.load_range(ids, self.day, end).keys(), schedules.keys())
+        set_many.assert_not_called()
+
+    def test_admin_cancellation_frees_the_slot(self):
+        appointment = Appointment.objects.create(student=self.student, instructor=self.instructor, scheduled_time=self.at(self.day, 14))
+        self.assertNotIn('14:00', self.slots())
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:drivingschool_appointment_changelist'), {
+                'form-TOTAL_FORMS': 1, 'form-INITIAL_FORMS': 1, 'form-0-id': appointment.id,
+                'form-0-status': 'Cancelled', 'form-0-test_passed': 'unknown', '_save': 'Save',
+            })
+        self.assertEqual(Appointment.objects.get().status, 'Cancelled')
+        self.assertIn('14:00', self.slots())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SchedulingTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.instructor = Instructor.objects.create(user=User.objects.create_user('teacher'))
+        self.student = Student.objects.create(user=User.objects.create_user('learner'))
+        self.day = timezone.localdate() + timedelta(days=3)
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, datetime.min.time()).replace(hour=hour, minute=minute))
+
+    def lesson(self, hour, minute=0, minutes=scheduling.LESSON_MINUTES):
+        return Appointment.objects.create(student=self.student, instructor=self.instructor, scheduled_time=self.at(hour, minute), duration_minutes=minutes)
+
+    def conflicts(self, hour, minute=0, minutes=scheduling.LESSON_MINUTES, exclude_id=None):
+        start = self.at(hour, minute)
+        return scheduling.has_conflict(self.instructor.id, start, start + timedelta(minutes=minutes), exclude_id)
+
+    def test_ninety_minute_lesson(self):
+        self.lesson(10, minutes=90)
+        self.assertTrue(self.conflicts(11, 0, 60))
+        self.assertTrue(self.conflicts(9, 0, 90))
+        self.assertFalse(self.conflicts(11, 30, 60))
+        schedule = availability.busy_schedule(self.instructor.id, self.day)
+        self.assertEqual(availability.booked_slots(schedule), ['10:00', '11:00'])
+        self.assertNotIn('11:00', availability.available_slots(schedule, self.day, duration=60))
+
+    def test_half_hour_start(self):
+        self.lesson(9, 30, 60)
+        self.assertTrue(self.conflicts(9, 0, 60))
+        self.assertTrue(self.conflicts(10, 0, 60))
+        self.assertFalse(self.conflicts(10, 30, 60))
+        schedule = availability.busy_schedule(self.instructor.id, self.day)
+        self.assertEqual(availability.booked_slots(schedule), ['09:00', '10:00'])
+        self.assertEqual(availability.available_slots(schedule, self.day, duration=60)[0], '11:00')
+
+    def test_back_to_back_lessons_do_not_conflict(self):
+        self.lesson(10)
+        self.assertFalse(self.conflicts(12))
+        self.assertFalse(self.conflicts(8))
+        self.assertTrue(self.conflicts(11, 59))
+        self.lesson(12)
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_reschedule_ignores_the_lesson_being_moved(self):
+        appointment = self.lesson(10)
+        self.assertTrue(self.conflicts(11))
+        self.assertFalse(self.conflicts(11, exclude_id=appointment.id))
+        self.lesson(13)
+        self.assertTrue(self.conflicts(12, exclude_id=appointment.id))
+
+    def test_duration_parameter(self):
+        self.lesson(13, minutes=60)
+        params = {'instructor_id': self.instructor.id, 'date': self.day.isoformat()}
+        url = reverse('get_available_slots')
+        # The default two-hour lesson starting at noon would run into 13:00
+        self.assertNotIn('12:00', self.client.get(url, params).json()['available_slots'])
+        self.assertIn('12:00', self.client.get(url, {**params, 'duration': 60}).json()['available_slots'])
+        self.assertEqual(self.client.get(url, {**params, 'duration': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {**params, 'duration': scheduling.MAX_LESSON_MINUTES + 1}).status_code, 400)
+
+        url = reverse('get_available_slots_batch')
+        params = {'start': self.day.isoformat(), 'end': self.day.isoformat()}
+        slots = lambda response: response.json()['instructors'][0]['available_slots'][self.day.isoformat()]
+        self.assertNotIn('12:00', slots(self.client.get(url, params)))
+        self.assertIn('12:00', slots(self.client.get(url, {**params, 'duration': 60})))
+        self.assertEqual(self.client.get(url, {**params, 'duration': 'long'}).status_code, 400)
+
+    def test_duration_is_bounded(self):
+        with self.assertRaises(ValidationError):
+            Appointment(student=self.student, instructor=self.instructor, scheduled_time=self.at(10), duration_minutes=scheduling.MAX_LESSON_MINUTES + 1).full_clean()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.lesson(10, minutes=scheduling.MAX_LESSON_MINUTES + 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.lesson(10, minutes=0)
+        self.lesson(10, minutes=scheduling.MAX_LESSON_MINUTES)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BookLessonTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.instructor = Instructor.objects.create(user=User.objects.create_user('teacher'))
+        self.student = Student.objects.create(user=User.objects.create_user('learner'), available_credits=4)
+        self.client.force_login(self.student.user)
+        self.day = timezone.localdate() + timedelta(days=3)
+
+    def book(self, time='10:00'):
+        return self.client.post(reverse('book_lesson'), {
+            'selected_date': self.day.isoformat(), 'selected_time': time, 'selected_instructor': self.instructor.id,
+        })
+
+    def assertRefused(self, response, redirect_to, message, credits):
+        self.assertRedirects(response, reverse(redirect_to), fetch_redirect_response=False)
+        self.assertIn(message, [str(m) for m in get_messages(response.wsgi_request)])
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.available_credits, credits)
+
+    def test_overlapping_booking_is_rejected(self):
+        self.assertRedirects(self.book('10:00'), reverse('student_portal'), fetch_redirect_response=False)
+        self.assertRefused(self.book('11:00'), 'booking_page', 'Instructor not available for a 2-hour slot starting at the selected time.', 2)
+        self.assertEqual(Appointment.objects.count(), 1)
+        # Straight after the first lesson ends is fine
+        self.assertRedirects(self.book('12:00'), reverse('student_portal'), fetch_redirect_response=False)
+
+    def test_student_without_enough_credits_is_refused(self):
+        Student.objects.filter(pk=self.student.pk).update(available_credits=1)
+        self.assertRefused(self.book(), 'plan_selection', 'You need at least 2 credits to book a 2-hour lesson.', 1)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_racing_booking_caught_by_unique_slot(self):
+        other = Student.objects.create(user=User.objects.create_user('rival'))
+        start = timezone.make_aware(datetime.combine(self.day, datetime.min.time()).replace(hour=10))
+        Appointment.objects.create(student=other, instructor=self.instructor, scheduled_time=start)
+        # The rival's row commits after our conflict check has already passed
+        with mock.patch('drivingschool.scheduling.has_conflict', return_value=False):
+            response = self.book('10:00')
+        self.assertRefused(response, 'booking_page', 'Instructor not available for a 2-hour slot starting at the selected time.', 4)
+        self.assertEqual(Appointment.objects.get().student, other)
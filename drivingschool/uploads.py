@@ -0,0 +1,172 @@
+# driving_school/uploads.py
+"""
+CV uploads for job applications.
+
+``CVUploadHandler`` streams each uploaded file to a temporary file in chunks,
+hashing it as it goes. It rejects a file as soon as the type signature or
+the size limit is wrong, so an oversized upload is never written out in
+full. CVs are stored under their SHA-256 (``careers/ab/abcd....pdf``), so an
+identical CV uploaded twice is written once. Text extraction for admin
+search happens later, in the ``extract_cv_text`` command.
+"""
+import hashlib
+import os
+import re
+import uuid
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.utils.deconstruct import deconstructible
+
+# File signatures of the CV formats we accept
+CV_SIGNATURES = {
+    '.pdf': [b'%PDF-'],
+    '.doc': [b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'],
+    '.docx': [b'PK\x03\x04'],
+}
+
+
+def cv_max_size():
+    return settings.CV_MAX_UPLOAD_SIZE
+
+
+def file_sha256(file):
+    """SHA-256 of an uploaded or stored file, reusing the handler's digest when present."""
+    digest = getattr(file, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+class CVUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploads to disk while checking extension, signature and size.
+    Rejected files are skipped and the reason is kept in ``errors`` by field
+    name for the form to report.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = {}
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.extension = os.path.splitext(file_name)[1].lower()
+        self.received = 0
+        self.sha256 = hashlib.sha256()
+        if self.extension not in CV_SIGNATURES:
+            self.reject('Please upload a PDF or Word document.')
+        if content_length and content_length > cv_max_size():
+            self.reject(self.too_large())
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not any(raw_data.startswith(signature) for signature in CV_SIGNATURES[self.extension]):
+            self.reject("The file's contents do not match its type.")
+        self.received += len(raw_data)
+        if self.received > cv_max_size():
+            self.reject(self.too_large())
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
+
+    def too_large(self):
+        return f'Files must be smaller than {cv_max_size() // (1024 * 1024)} MB.'
+
+    def reject(self, message):
+        # The parser closes the temp file and discards the rest of the part
+        self.errors[self.field_name] = message
+        raise SkipFile(message)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Storage whose names are content hashes: saving bytes it already has is a no-op."""
+
+    def get_available_name(self, name, max_length=None):
+        # An existing file under this name already holds the same bytes
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        # Write under a private name, then link it into place. A concurrent
+        # save of the same bytes may win the link; its file is just as good.
+        # (FileSystemStorage's own retry would ask get_available_name for a
+        # new name, get this one back, and spin forever.)
+        partial = super()._save(f"{name}.{uuid.uuid4().hex}.part", content)
+        try:
+            os.link(self.path(partial), self.path(name))
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(self.path(partial))
+        return name
+
+
+def cv_storage():
+    return ContentAddressedStorage()
+
+
+def cv_upload_to(instance, filename):
+    digest = instance.cv_sha256 or file_sha256(instance.cv.file)
+    return f"careers/{digest[:2]}/{digest}{os.path.splitext(filename)[1].lower()}"
+
+
+# Text extraction
+
+PDF_STREAM = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+PDF_TEXT = re.compile(rb'\((.*?)(?<!\\)\)\s*Tj|\[(.*?)\]\s*TJ', re.S)
+PDF_STRING = re.compile(rb'\((.*?)(?<!\\)\)', re.S)
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def pdf_text(path):
+    """Text of a PDF, via pypdf when installed, otherwise from its text operators."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+    if PdfReader is not None:
+        return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    pieces = []
+    for stream in PDF_STREAM.findall(data):
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for single, array in PDF_TEXT.findall(stream):
+            strings = [single] if single else PDF_STRING.findall(array)
+            pieces.append(b''.join(strings).decode('latin-1'))
+    return ' '.join(pieces)
+
+
+def docx_text(path):
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    paragraphs = root.iter(f'{WORD_NAMESPACE}p')
+    return '\n'.join(''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t')) for paragraph in paragraphs)
+
+
+def extract_text(path):
+    """Best-effort plain text of a stored CV; legacy .doc files yield ''."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        return pdf_text(path)
+    if extension == '.docx':
+        return docx_text(path)
+    return ''
@@ -44,6 +44,7 @@ urlpatterns = [
     # Instructor
     path('instructor/', views.instructor_portal, name='instructor_portal'),
     path('instructor/complete/<int:appt_id>/', views.mark_complete, name='mark_complete'),
+    path('instructor/complete/', views.mark_complete_bulk, name='mark_complete_bulk'),
 
     # Admin
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
@@ -53,4 +54,5 @@ urlpatterns = [
     # API
     path('api/chatbot/', views.chatbot_api, name='chatbot_api'),
     path('api/available-slots/', views.get_available_slots, name='get_available_slots'),
+    path('api/available-slots/batch/', views.get_available_slots_batch, name='get_available_slots_batch'),
 ]
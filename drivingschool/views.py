@@ -1,25 +1,22 @@
 # driving_school/views.py
 # import stripe
 import json
-import random
-import string
+import uuid
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.http import JsonResponse, HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from datetime import datetime, timedelta
-# from twilio.rest import Client
 from .models import *
 from .forms import *
-
-# Twilio setup
-# twilio_client = Client(settings.TWILIO_SID, settings.TWILIO_AUTH_TOKEN)
+from . import availability, catalog, outbox, portal, reports, scheduling, sms, stats, uploads
+from .pagecache import anonymous_page_cache
 
 # Stripe setup
 # stripe.api_key = settings.STRIPE_SECRET_KEY
@@ -37,21 +34,25 @@ def is_admin(user):
 # Public Pages
 # ======================
 
+@anonymous_page_cache
 def home(request):
-    plans = LessonPlan.objects.all()
-    total_students = Student.objects.count()
+    plans = catalog.active_plans()
+    site_stats = stats.site_stats()
     return render(request, 'index.html', {
         'plans': plans,
-        'total_students': total_students,
-        'pass_rate': '98%'
+        'stats': site_stats,
+        'total_students': site_stats['students'],
+        'pass_rate': f"{site_stats['pass_rate']}%",
     })
 
+@anonymous_page_cache
 def lessons(request):
     return render(request, 'lessons.html')
 
+@anonymous_page_cache
 def pricing(request):
-    standard_plans = LessonPlan.objects.filter(package_type='standard', is_active=True).order_by('display_order', 'name')
-    specialized_plans = LessonPlan.objects.filter(package_type='specialized', is_active=True).order_by('display_order', 'name')
+    standard_plans = catalog.plans_by_type('standard')
+    specialized_plans = catalog.plans_by_type('specialized')
     
     context = {
         'standard_plans': standard_plans,
@@ -59,9 +60,11 @@ def pricing(request):
     }
     return render(request, 'pricing.html', context)
 
+@anonymous_page_cache
 def dmv_test_help(request):
     return render(request, 'dmv-test-help.html')
 
+@anonymous_page_cache
 def about(request):
     instructors = Instructor.objects.all()
     reviews = Review.objects.order_by('-created_at')[:3]
@@ -72,36 +75,41 @@ def contact(request):
         name = request.POST.get('name')
         email = request.POST.get('email')
         message = request.POST.get('message')
-        send_mail(
+        # Delivered by the send_outbound_messages worker, not on the request path
+        outbox.enqueue_email(
+            settings.ADMIN_EMAIL,
             subject=f"Contact from {name}",
-            message=message,
-            recipient_list=[settings.ADMIN_EMAIL],
-            from_email=email
+            body=message,
+            reply_to=email
         )
         messages.success(request, "Message sent!")
         return redirect('contact')
     return render(request, 'contact.html')
 
+@csrf_exempt
 def careers(request):
+    # Upload handlers must be swapped before CSRF middleware reads the body,
+    # so the CSRF check runs in careers_form instead
+    upload_handler = uploads.CVUploadHandler(request)
+    request.upload_handlers = [upload_handler]
+    return careers_form(request, upload_handler.errors)
+
+@csrf_protect
+def careers_form(request, upload_errors):
+    form = JobApplicationForm()
     try:
         if request.method == 'POST':
-            form = JobApplicationForm(request.POST, request.FILES)
+            form = JobApplicationForm(request.POST, request.FILES, upload_errors=upload_errors)
             if form.is_valid():
                 app = form.save()
-                # # Send SMS to admin
-                # twilio_client.messages.create(
-                #     body=f"New job application from {app.first_name} {app.last_name}",
-                #     from_=settings.TWILIO_PHONE,
-                #     to=settings.ADMIN_PHONE
-                # )
+                # Admin alert goes out in the next applications digest
+                sms.enqueue_sms(settings.ADMIN_PHONE, f"{app.first_name} {app.last_name} ({app.email})", digest_key='applications')
                 messages.success(request, "Application submitted!")
                 print(f"Application submitted: {app}")
                 return redirect('careers')
     except Exception as e:
         print("ERROR: ", e)
         messages.error(request, f"Error: {e}")
-    else:
-        form = JobApplicationForm()
     return render(request, 'careers.html', {'form': form}) 
 
 # ======================
@@ -141,7 +149,7 @@ def plan_selection(request):
         except Exception as e:
             messages.error(request, 'Unable to create student profile. Please contact support.')
             return redirect('home')
-    plans = LessonPlan.objects.all()
+    plans = catalog.active_plans()
     if request.method == 'POST':
         plan_id = request.POST.get('plan_id')
         if plan_id:
@@ -163,17 +171,9 @@ def login_view(request):
         username_or_email = request.POST['username']
         password = request.POST['password']
         
-        # Try to authenticate with username first
+        # UsernameOrEmailBackend accepts either in a single lookup
         user = authenticate(request, username=username_or_email, password=password)
-        
-        # If that fails, try to find user by email and authenticate
-        if not user:
-            try:
-                user_obj = User.objects.get(email=username_or_email)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                user = None
-        
+
         if user:
             login(request, user)
             # Handle remember me functionality
@@ -208,46 +208,8 @@ def redirect_to_about(request, exception=None):
 @login_required
 @user_passes_test(is_student)
 def student_portal(request):
-    student = request.user.student
-    appointments = Appointment.objects.filter(student=student).order_by('-scheduled_time')
-    completed = appointments.filter(status='Completed').count()
-    progress = (completed / max(student.total_credits, 1)) * 100 if student.total_credits > 0 else 0
-    
-    # Get available plans for purchase
-    plans = LessonPlan.objects.all()
-    
-    # Get student's plan purchases
-    plan_purchases = StudentPlanPurchase.objects.filter(student=student, payment_status='completed')
-    
-    # Get cart items count
-    try:
-        cart = Cart.objects.get(student=student)
-        cart_items_count = CartItem.objects.filter(cart=cart).count()
-    except Cart.DoesNotExist:
-        cart_items_count = 0
-    
-    # Get purchased plans
-    purchased_plans = StudentPlanPurchase.objects.filter(
-        student=student,
-        payment_status='completed'
-    ).select_related('plan').order_by('-purchase_date')
-    
-    # Get available instructors for reschedule modal
-    instructors = Instructor.objects.filter(is_available=True)
-    
-    return render(request, 'student-portal.html', {
-        'student': student,
-        'appointments': appointments,
-        'completed': completed,
-        'total': student.total_credits,
-        'progress': progress,
-        'plans': plans,
-        'plan_purchases': plan_purchases,
-        'available_credits': student.available_credits,
-        'cart_items_count': cart_items_count,
-        'purchased_plans': purchased_plans,
-        'instructors': instructors
-    })
+    context = portal.student_portal_context(request.user.student.id, request.GET.get('page'))
+    return render(request, 'student-portal.html', context)
 
 @login_required
 @user_passes_test(is_student)
@@ -324,62 +286,70 @@ def book_lesson(request):
                 scheduled_datetime = datetime.combine(date_obj, time_obj)
                 scheduled_datetime = timezone.make_aware(scheduled_datetime)
                 
-                # Get instructor
-                instructor = get_object_or_404(Instructor, id=selected_instructor_id, is_available=True)
-                
                 # Validate booking for a 2-hour block
                 if scheduled_datetime < timezone.now():
                     messages.error(request, "Can't book in the past.")
                     return redirect('booking_page')
                 
-                next_hour = scheduled_datetime + timedelta(hours=1)
-                # Conflict checks: current hour, next hour, and overlap with previous 2-hour appointments
-                if (
-                    Appointment.objects.filter(instructor=instructor, scheduled_time=scheduled_datetime).exists()
-                    or Appointment.objects.filter(instructor=instructor, scheduled_time=next_hour).exists()
-                    or Appointment.objects.filter(
-                        instructor=instructor,
-                        scheduled_time=scheduled_datetime - timedelta(hours=1),
-                        duration_minutes__gte=120
-                    ).exists()
-                ):
-                    messages.error(request, "Instructor not available for a 2-hour slot starting at the selected time.")
-                    return redirect('booking_page')
-
-                # Determine eligible lesson type and plan from purchases
-                purchases = StudentPlanPurchase.objects.filter(
+                # Determine eligible lesson type and plan from purchases (test plans first)
+                latest_purchase = StudentPlanPurchase.objects.filter(
                     student=student,
                     payment_status='completed'
-                ).select_related('plan').order_by('-purchase_date')
-
-                test_purchase = purchases.filter(plan__includes_test=True).first()
-                if test_purchase:
-                    enforced_lesson_type = 'test_prep'
-                    enforced_plan = test_purchase.plan
-                else:
-                    enforced_lesson_type = 'beginner'
-                    enforced_plan = purchases.first().plan if purchases.exists() else None
+                ).select_related('plan').order_by('-plan__includes_test', '-purchase_date').first()
                 
-                # Create appointment (2-hour duration)
-                appointment = Appointment.objects.create(
-                    student=student,
-                    instructor=instructor,
-                    scheduled_time=scheduled_datetime,
-                    lesson_type=enforced_lesson_type,
-                    special_requirements=special_requirements,
-                    status='Scheduled',
-                    credits_used=2,
-                    duration_minutes=120,
-                    plan=enforced_plan
-                )
+                enforced_plan = latest_purchase.plan if latest_purchase else None
+                enforced_lesson_type = 'test_prep' if enforced_plan and enforced_plan.includes_test else 'beginner'
                 
-                # Deduct two credits on booking
-                student.available_credits = max(0, student.available_credits - 2)
-                student.save()
+                with transaction.atomic():
+                    # Lock the instructor row so concurrent bookings for the same instructor serialize;
+                    # the user is joined for the SMS text but left unlocked
+                    instructor = get_object_or_404(
+                        Instructor.objects.select_related('user').select_for_update(of=('self',)),
+                        id=selected_instructor_id,
+                        is_available=True
+                    )
+                    
+                    # Conflict check: any scheduled lesson overlapping the new 2-hour interval
+                    if scheduling.has_conflict(
+                        instructor.id,
+                        scheduled_datetime,
+                        scheduled_datetime + timedelta(minutes=scheduling.LESSON_MINUTES)
+                    ):
+                        messages.error(request, "Instructor not available for a 2-hour slot starting at the selected time.")
+                        return redirect('booking_page')
+                    
+                    # Deduct two credits only if the student still has them
+                    if not Student.objects.filter(pk=student.pk, available_credits__gte=2).update(
+                        available_credits=F('available_credits') - 2
+                    ):
+                        messages.error(request, 'You need at least 2 credits to book a 2-hour lesson.')
+                        return redirect('plan_selection')
+                    
+                    # Create appointment (2-hour duration)
+                    appointment = Appointment.objects.create(
+                        student=student,
+                        instructor=instructor,
+                        scheduled_time=scheduled_datetime,
+                        lesson_type=enforced_lesson_type,
+                        special_requirements=special_requirements,
+                        status='Scheduled',
+                        credits_used=2,
+                        duration_minutes=scheduling.LESSON_MINUTES,
+                        plan=enforced_plan
+                    )
+                    sms.enqueue_sms(
+                        settings.ADMIN_PHONE,
+                        f"{student} with {instructor}, {scheduled_datetime.strftime('%b %d %I:%M %p')}",
+                        digest_key='bookings'
+                    )
                 
                 messages.success(request, f"Lesson booked successfully for {scheduled_datetime.strftime('%B %d, %Y at %I:%M %p')}! 2 credits have been deducted.")
                 return redirect('student_portal')
                 
+            except IntegrityError:
+                # The unique slot constraint caught a booking that raced ours
+                messages.error(request, "Instructor not available for a 2-hour slot starting at the selected time.")
+                return redirect('booking_page')
             except Exception as e:
                 messages.error(request, f"Error booking lesson: {str(e)}")
                 return redirect('booking_page')
@@ -519,13 +489,13 @@ def reschedule_appointment(request):
                     'error': 'Selected instructor is not available.'
                 })
             
-            # Check if new time slot is available
-            existing_appointment = Appointment.objects.filter(
-                instructor=instructor,
-                scheduled_time=new_scheduled_datetime
-            ).exclude(id=appointment_id).exists()
-            
-            if existing_appointment:
+            # Check if the new interval overlaps another scheduled lesson
+            if scheduling.has_conflict(
+                instructor.id,
+                new_scheduled_datetime,
+                new_scheduled_datetime + timedelta(minutes=appointment.duration_minutes),
+                exclude_id=appointment.id
+            ):
                 return JsonResponse({
                     'success': False,
                     'error': 'Selected time slot is not available.'
@@ -534,6 +504,9 @@ def reschedule_appointment(request):
             # Update the appointment
             appointment.scheduled_time = new_scheduled_datetime
             appointment.instructor = instructor
+            # Reminders are owed again for the new time
+            appointment.reminder_24h_sent_at = None
+            appointment.reminder_2h_sent_at = None
             if reason:
                 appointment.notes = f"Rescheduled: {reason}" + (f" | Previous notes: {appointment.notes}" if appointment.notes else "")
             appointment.save()
@@ -634,19 +607,14 @@ def add_to_cart_and_checkout(request, plan_name):
 def view_cart(request):
     """Display the student's cart"""
     student = request.user.student
-    
-    try:
-        cart = Cart.objects.get(student=student)
-        cart_items = CartItem.objects.filter(cart=cart).select_related('plan')
-    except Cart.DoesNotExist:
-        cart = None
-        cart_items = []
+    cart = Cart.objects.with_totals().filter(student=student).first()
+    cart_items = CartItem.objects.filter(cart=cart).select_related('plan') if cart else []
     
     return render(request, 'cart.html', {
         'cart': cart,
         'cart_items': cart_items,
-        'total_price': cart.get_total_price() if cart else 0,
-        'total_credits': cart.get_total_credits() if cart else 0
+        'total_price': cart.total_price if cart else 0,
+        'total_credits': cart.total_credits if cart else 0
     })
 
 @login_required
@@ -664,24 +632,21 @@ def remove_from_cart(request, item_id):
 def checkout_cart(request):
     """Process cart checkout"""
     student = request.user.student
+    cart = Cart.objects.with_totals().filter(student=student).first()
     
-    try:
-        cart = Cart.objects.get(student=student)
-        cart_items = CartItem.objects.filter(cart=cart).select_related('plan')
-        
-        if not cart_items.exists():
-            messages.error(request, 'Your cart is empty.')
-            return redirect('view_cart')
-        
-    except Cart.DoesNotExist:
+    if cart is None:
         messages.error(request, 'Your cart is empty.')
         return redirect('student_portal')
+    if not cart.item_count:
+        messages.error(request, 'Your cart is empty.')
+        return redirect('view_cart')
     
     return render(request, 'checkout_cart.html', {
         'cart': cart,
-        'cart_items': cart_items,
-        'total_price': cart.get_total_price(),
-        'total_credits': cart.get_total_credits()
+        'cart_items': CartItem.objects.filter(cart=cart).select_related('plan'),
+        'total_price': cart.total_price,
+        'total_credits': cart.total_credits,
+        'order_key': uuid.uuid4().hex
     })
 
 def checkout(request, plan_id):
@@ -717,6 +682,10 @@ def payment_success(request):
     messages.success(request, f"{plan.hours} credits added!")
     return redirect('student_portal')
 
+def new_payment_id():
+    """Collision-free reference for a (demo) payment"""
+    return f"PAY_{uuid.uuid4().hex.upper()}"
+
 @login_required
 @user_passes_test(is_student)
 def process_cart_payment(request):
@@ -725,49 +694,52 @@ def process_cart_payment(request):
         return redirect('view_cart')
     
     student = request.user.student
+    # Issued by checkout_cart; a resubmitted form carries the same key
+    order_key = request.POST.get('order_key') or uuid.uuid4().hex
     
     try:
-        cart = Cart.objects.get(student=student)
-        cart_items = CartItem.objects.filter(cart=cart).select_related('plan')
-        
-        if not cart_items.exists():
-            messages.error(request, 'Your cart is empty.')
-            return redirect('view_cart')
-        
-        # Process each item in the cart
-        total_credits = 0
-        purchased_plans = []
-        
-        for item in cart_items:
-            # Create purchase record
-            purchase = StudentPlanPurchase.objects.create(
-                student=student,
-                plan=item.plan,
-                credits_granted=item.plan.hours,
-                payment_status='completed',
-                payment_id=f"PAY_{random.randint(100000, 999999)}"
+        with transaction.atomic():
+            # Lock the cart so concurrent submits are processed one after the other
+            cart = Cart.objects.select_for_update().filter(student=student).first()
+            
+            if StudentPlanPurchase.objects.filter(student=student, order_key=order_key).exists():
+                messages.info(request, 'This order has already been processed.')
+                return redirect('student_portal')
+            
+            plans = [item.plan for item in CartItem.objects.filter(cart=cart).select_related('plan')] if cart else []
+            if not plans:
+                messages.error(request, 'Your cart is empty.')
+                return redirect('view_cart')
+            
+            payment_id = new_payment_id()
+            StudentPlanPurchase.objects.bulk_create([
+                StudentPlanPurchase(
+                    student=student,
+                    plan=plan,
+                    credits_granted=plan.hours,
+                    payment_status='completed',
+                    payment_id=payment_id,
+                    order_key=order_key,
+                )
+                for plan in plans
+            ])
+            
+            total_credits = sum(plan.hours for plan in plans)
+            Student.objects.filter(pk=student.pk).update(
+                available_credits=F('available_credits') + total_credits,
+                total_credits=F('total_credits') + total_credits,
             )
             
-            total_credits += item.plan.hours
-            purchased_plans.append(item.plan.name)
-        
-        # Update student credits
-        student.available_credits += total_credits
-        student.total_credits += total_credits
-        student.save()
-        
-        # Clear the cart
-        cart_items.delete()
-        
-        # Success message
-        plan_names = ', '.join(purchased_plans)
-        messages.success(request, f'Payment successful! You have purchased: {plan_names}. {total_credits} credits have been added to your account.')
-        
-        return redirect('student_portal')
-        
-    except Cart.DoesNotExist:
-        messages.error(request, 'Your cart is empty.')
+            # Clear the cart
+            CartItem.objects.filter(cart=cart).delete()
+    except IntegrityError:
+        # Another submit of the same order won the race
+        messages.info(request, 'This order has already been processed.')
         return redirect('student_portal')
+    
+    plan_names = ', '.join(plan.name for plan in plans)
+    messages.success(request, f'Payment successful! You have purchased: {plan_names}. {total_credits} credits have been added to your account.')
+    return redirect('student_portal')
 
 @login_required
 @user_passes_test(is_student)
@@ -794,18 +766,23 @@ def payment_page(request, purchase_id):
     purchase = get_object_or_404(StudentPlanPurchase, id=purchase_id, student=request.user.student)
     
     if request.method == 'POST':
-        # Simulate payment processing
-        purchase.payment_status = 'completed'
-        purchase.payment_id = f"PAY_{random.randint(100000, 999999)}"
-        purchase.save()
-        
-        # Add credits to student account
-        student = purchase.student
-        student.available_credits += purchase.credits_granted
-        student.total_credits += purchase.credits_granted
-        student.save()
+        # Simulate payment processing; only the first submit moves it out of pending
+        with transaction.atomic():
+            paid = StudentPlanPurchase.objects.filter(pk=purchase.pk, payment_status='pending').update(
+                payment_status='completed',
+                payment_id=new_payment_id(),
+            )
+            if paid:
+                # Add credits to student account
+                Student.objects.filter(pk=purchase.student_id).update(
+                    available_credits=F('available_credits') + purchase.credits_granted,
+                    total_credits=F('total_credits') + purchase.credits_granted,
+                )
         
-        messages.success(request, f'Payment successful! {purchase.credits_granted} credits have been added to your account.')
+        if paid:
+            messages.success(request, f'Payment successful! {purchase.credits_granted} credits have been added to your account.')
+        else:
+            messages.info(request, 'This purchase has already been paid.')
         return redirect('student_portal')
     
     return render(request, 'payment_page.html', {
@@ -820,11 +797,47 @@ def payment_page(request, purchase_id):
 @login_required
 @user_passes_test(is_instructor)
 def instructor_portal(request):
+    """Instructor schedule for today, this week, a date range or past lessons"""
     instructor = request.user.instructor
-    appointments = Appointment.objects.filter(instructor=instructor).order_by('scheduled_time')
+    window = request.GET.get('window', 'week')
+    today = timezone.localdate()
+    range_start = request.GET.get('start', '')
+    range_end = request.GET.get('end', '')
+    
+    if window == 'range':
+        try:
+            first_day = datetime.strptime(range_start, '%Y-%m-%d').date()
+            last_day = datetime.strptime(range_end, '%Y-%m-%d').date()
+            if last_day < first_day:
+                raise ValueError
+        except ValueError:
+            messages.error(request, "Please choose a valid date range.")
+            window = 'week'
+    
+    if window == 'today':
+        first_day = last_day = today
+    elif window not in ('range', 'history'):
+        window = 'week'
+        first_day = today - timedelta(days=today.weekday())
+        last_day = first_day + timedelta(days=6)
+    
+    if window == 'history':
+        start, end = None, timezone.now()
+    else:
+        start, end = availability.day_bounds(first_day, last_day)
+    
+    appointments, next_cursor = portal.instructor_schedule(
+        instructor.id, start, end,
+        after=request.GET.get('after'),
+        descending=window == 'history',
+    )
     return render(request, 'instructor-portal.html', {
         'instructor': instructor,
-        'appointments': appointments
+        'appointments': appointments,
+        'window': window,
+        'range_start': range_start,
+        'range_end': range_end,
+        'next_cursor': next_cursor,
     })
 
 @login_required
@@ -834,10 +847,31 @@ def mark_complete(request, appt_id):
     if appt.status == 'Scheduled':
         appt.status = 'Completed'
         appt.save()
+        stats.adjust('completed_lessons', 1)
         # Credit already deducted on booking
         messages.success(request, "Marked complete.")
     return redirect('instructor_portal')
 
+@login_required
+@user_passes_test(is_instructor)
+def mark_complete_bulk(request):
+    """Mark several of the instructor's scheduled appointments complete in one update"""
+    if request.method != 'POST':
+        return redirect('instructor_portal')
+    
+    try:
+        appt_ids = [int(appt_id) for appt_id in request.POST.getlist('appt_ids')]
+    except ValueError:
+        appt_ids = []
+    if not appt_ids:
+        messages.error(request, "Select at least one appointment to complete.")
+        return redirect('instructor_portal')
+    
+    appointments = Appointment.objects.filter(id__in=appt_ids, instructor=request.user.instructor)
+    completed = availability.close_appointments(appointments, 'Completed')
+    messages.success(request, f"Marked {completed} appointment{'s' if completed != 1 else ''} complete.")
+    return redirect('instructor_portal')
+
 # ======================
 # Admin Dashboard
 # ======================
@@ -845,11 +879,16 @@ def mark_complete(request, appt_id):
 @login_required
 @user_passes_test(is_admin)
 def admin_dashboard(request):
+    revenue_breakdown = reports.revenue_breakdown()
     return render(request, 'admin/dashboard.html', {
         'students': Student.objects.count(),
         'instructors': Instructor.objects.count(),
         'appointments': Appointment.objects.count(),
-        'revenue': sum(a.plan.price for a in Appointment.objects.filter(status='Completed') if a.plan),
+        'revenue': reports.total_revenue(),
+        'revenue_by_day': revenue_breakdown['day'],
+        'revenue_by_week': revenue_breakdown['week'],
+        'revenue_by_month': revenue_breakdown['month'],
+        'daily_trends': reports.daily_trends(14),
         'applications': JobApplication.objects.count(),
     })
 
@@ -903,6 +942,21 @@ def chatbot_api(request):
     
     return JsonResponse({'error': 'Method not allowed'}, status=405)
 
+# Longest range the batch availability API will compute in one request
+BATCH_SLOTS_MAX_DAYS = 62
+
+def parse_lesson_duration(value):
+    """Parse the optional ``duration`` query parameter in minutes (None if invalid)"""
+    if not value:
+        return scheduling.LESSON_MINUTES
+    try:
+        duration = int(value)
+    except ValueError:
+        return None
+    if not 0 < duration <= scheduling.MAX_LESSON_MINUTES:
+        return None
+    return duration
+
 @csrf_exempt
 def get_available_slots(request):
     """API endpoint to get available time slots for a specific instructor and date"""
@@ -914,6 +968,10 @@ def get_available_slots(request):
             if not instructor_id or not date_str:
                 return JsonResponse({'error': 'instructor_id and date are required'}, status=400)
             
+            duration = parse_lesson_duration(request.GET.get('duration'))
+            if duration is None:
+                return JsonResponse({'error': f'duration must be between 1 and {scheduling.MAX_LESSON_MINUTES} minutes'}, status=400)
+            
             # Parse the date
             try:
                 selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
@@ -922,48 +980,16 @@ def get_available_slots(request):
             
             # Get instructor
             try:
-                instructor = Instructor.objects.get(id=instructor_id, is_available=True)
+                instructor = Instructor.objects.select_related('user').get(id=instructor_id, is_available=True)
             except Instructor.DoesNotExist:
                 return JsonResponse({'error': 'Instructor not found or not available'}, status=404)
             
-            # Define all possible time slots (9 AM to 5 PM)
-            all_slots = [
-                '09:00', '10:00', '11:00', '12:00', 
-                '13:00', '14:00', '15:00', '16:00', '17:00'
-            ]
-            
-            # Get booked appointments for this instructor on this date
-            booked_appointments = Appointment.objects.filter(
-                instructor=instructor,
-                scheduled_time__date=selected_date,
-                status__in=['Scheduled']  # Only consider scheduled appointments
-            )
+            # Booked intervals come from the per-instructor availability index
+            schedule = availability.busy_schedule(instructor.id, selected_date)
+            booked_times = availability.booked_slots(schedule)
             
-            # Extract booked time slots, including second hour for 2-hour appointments
-            booked_times = []
-            for appointment in booked_appointments:
-                start_str = appointment.scheduled_time.strftime('%H:%M')
-                booked_times.append(start_str)
-                if getattr(appointment, 'duration_minutes', 60) >= 120:
-                    second_hour = (appointment.scheduled_time + timedelta(hours=1)).strftime('%H:%M')
-                    booked_times.append(second_hour)
-            
-            # Filter out booked slots and ensure 2-hour availability (consecutive slot free)
-            def next_hour_str(slot):
-                h, m = map(int, slot.split(':'))
-                return f"{h+1:02d}:{m:02d}"
-            available_slots = [
-                slot for slot in all_slots
-                if slot not in booked_times and next_hour_str(slot) in all_slots and next_hour_str(slot) not in booked_times
-            ]
-            
-            # Don't show past time slots for today
-            if selected_date == timezone.now().date():
-                current_time = timezone.now().time()
-                available_slots = [
-                    slot for slot in available_slots 
-                    if datetime.strptime(slot, '%H:%M').time() > current_time
-                ]
+            # Starts where the whole lesson fits, excluding past slots for today
+            available_slots = availability.available_slots(schedule, selected_date, duration=duration)
             
             return JsonResponse({
                 'available_slots': available_slots,
@@ -975,4 +1001,59 @@ def get_available_slots(request):
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
\ No newline at end of file
+    return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def get_available_slots_batch(request):
+    """API endpoint to get available time slots for every available instructor over a date range"""
+    if request.method == 'GET':
+        try:
+            start_str = request.GET.get('start')
+            end_str = request.GET.get('end')
+            
+            if not start_str or not end_str:
+                return JsonResponse({'error': 'start and end are required'}, status=400)
+            
+            duration = parse_lesson_duration(request.GET.get('duration'))
+            if duration is None:
+                return JsonResponse({'error': f'duration must be between 1 and {scheduling.MAX_LESSON_MINUTES} minutes'}, status=400)
+            
+            # Parse the date range
+            try:
+                start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+                end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+            except ValueError:
+                return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=400)
+            
+            if end_date < start_date:
+                return JsonResponse({'error': 'end must not be before start'}, status=400)
+            if (end_date - start_date).days >= BATCH_SLOTS_MAX_DAYS:
+                return JsonResponse({'error': f'Date range is limited to {BATCH_SLOTS_MAX_DAYS} days'}, status=400)
+            
+            instructors = list(Instructor.objects.filter(is_available=True).select_related('user'))
+            schedules = availability.load_range([i.id for i in instructors], start_date, end_date)
+            
+            now = timezone.now()
+            results = []
+            for instructor in instructors:
+                days = {}
+                day = start_date
+                while day <= end_date:
+                    days[day.isoformat()] = availability.available_slots(schedules[(instructor.id, day)], day, now, duration)
+                    day += timedelta(days=1)
+                results.append({
+                    'instructor_id': instructor.id,
+                    'instructor_name': instructor.user.get_full_name(),
+                    'available_slots': days,
+                })
+            
+            return JsonResponse({
+                'start': start_str,
+                'end': end_str,
+                'instructors': results
+            })
+            
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+    
+    return JsonResponse({'error': 'Method not allowed'}, status=405)
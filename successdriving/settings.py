@@ -57,13 +57,23 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory; in DEBUG the loader still
+            # notices edits through the autoreloader
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.static',
+                'drivingschool.context_processors.cart_badge',
+                'drivingschool.context_processors.content_versions',
+                'drivingschool.context_processors.site_stats',
             ],
         },
     },
@@ -83,6 +93,32 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Shared by every worker process and by cron commands, so entries and
+# invalidations written in one are seen by all. The availability index holds
+# an entry per instructor and day, so the default cache is sized far past
+# Django's 300 entries. Version stamps and site counters live in a cache of
+# their own that stays a handful of keys, so culling can never drop them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'default',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    'counters': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'counters',
+    },
+}
+
+
+# Authentication
+# Username or case-insensitive email, one lookup and one password hash per login
+AUTHENTICATION_BACKENDS = ['drivingschool.backends.UsernameOrEmailBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -126,15 +162,32 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# With DEBUG off, collectstatic builds hashed, minified and pre-compressed
+# assets (see drivingschool/assets.py); rerun it after changing static/
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG else 'drivingschool.assets.AssetStorage',
+    },
+}
+
 # Media files (User uploaded files)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Largest CV accepted by the careers form, checked while the upload streams in
+CV_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
 # Twilio Configuration
 TWILIO_SID = 'your_twilio_sid_here'
 TWILIO_AUTH_TOKEN = 'your_twilio_auth_token_here'
 TWILIO_PHONE = '+1234567890'
 
+# SMS delivery (see drivingschool/sms.py); use drivingschool.sms.FakeTransport locally
+SMS_TRANSPORT = 'drivingschool.sms.TwilioTransport'
+SMS_DIGEST_SIZE = 10
+SMS_DIGEST_WINDOW_MINUTES = 15
+
 # Stripe Configuration
 STRIPE_SECRET_KEY = 'your_stripe_secret_key_here'
 STRIPE_PUBLISHABLE_KEY = 'your_stripe_publishable_key_here'
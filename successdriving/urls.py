@@ -15,18 +15,22 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
+from drivingschool import assets
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('drivingschool.urls')),
 ]
 
-# Add static files serving for development
+# Collected assets with pre-compressed variants and far-future caching for
+# hashed names; a web server static mapping for STATIC_URL takes precedence
+urlpatterns += [re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), assets.serve)]
+
+# Add media files serving for development
 if settings.DEBUG:
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 # Redirect any 404 (missing route) to the About page